@@ -1,13 +1,17 @@
 import argparse
 import asyncio
+import logging
 import os
 from typing import Dict, Type
 from src.presentation_processor import PresentationProcessor
 from src.llm_processor import LLMProcessor, Summary
 from langchain.chat_models import init_chat_model
-from src.exporter import ExporterFactory, ExporterType
+from src.exporter import ExporterFactory, ExporterType, export_all
 from src.content_analyzer import ContentAnalyzer
+from src.run_store import RunStore, load_summary_file
+from src.token_budget import TokenBudgeter
 
+logger = logging.getLogger(__name__)
 
 
 def load_api_key() -> str:
@@ -16,41 +20,147 @@ def load_api_key() -> str:
         raise ValueError("OPENAI_API_KEY environment variable not set. Please set it using 'export OPENAI_API_KEY=your-key'")
     return api_key
 
+def run_pipeline(run: RunStore, llm_processor: LLMProcessor) -> Summary:
+    """
+    Runs every stage that has no checkpoint yet and returns the summary.
+    Stages already stored in the run are loaded instead of recomputed.
+    """
+    if run.has("summary"):
+        return run.load_summary()
+
+    if run.has("analyzed"):
+        analyzed_slides = run.load_analyzed()
+    else:
+        if run.has("slides"):
+            slides = run.load_slides()
+        else:
+            slides = PresentationProcessor().process_file(run.options["source_path"])
+            run.save_slides(slides)
+        analyzed_slides = ContentAnalyzer().analyze_presentation(slides)
+        run.save_analyzed(analyzed_slides)
+
+    if run.has("concepts"):
+        concepts = run.load_concepts()
+    else:
+        concepts = llm_processor.extract_concepts(analyzed_slides)
+        run.save_concepts(concepts)
+
+    if llm_processor.budgeter is not None:
+        summary, report = llm_processor.summarize_with_budget(concepts, analyzed_slides)
+        print(f"Output token budget:\n{report.format()}")
+    else:
+        summary = llm_processor.summarize(concepts)
+    run.save_summary(summary)
+    return summary
+
+def parse_target(value: str) -> Dict[str, str]:
+    """Parses an export target given as TYPE or TYPE=PATH."""
+    exporter, _, export_path = value.partition('=')
+    try:
+        ExporterType(exporter)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid exporter '{exporter}', choose from {[t.value for t in ExporterType]}"
+        )
+    return {'exporter': exporter, 'export_path': export_path or None}
+
 def main():
     parser = argparse.ArgumentParser(description='Notion Summary Automation CLI')
     parser.add_argument('--export_path', type=str, required=False,
-                      help='Output file path')
-    parser.add_argument('--source_path', type=str, required=True,
+                      help='Output file path, used when a single exporter is given without a path')
+    parser.add_argument('--source_path', type=str, required=False,
                       help='Source file path')
-    parser.add_argument('--exporter', type=ExporterType, default=ExporterType.MARKDOWN,
-                      help='Exporter type')
+    parser.add_argument('--exporter', type=parse_target, nargs='+', default=None, metavar='TYPE[=PATH]',
+                      help='One or more export targets, e.g. markdown=notes.md json=notes.json notion_api')
+    parser.add_argument('--token_budget', type=int, default=None,
+                      help='Output token budget for the whole deck, split between topics by their weight')
+    parser.add_argument('--runs_dir', type=str, default='runs',
+                      help='Directory where run checkpoints are stored')
+    parser.add_argument('--resume', type=str, metavar='RUN_ID',
+                      help='Resume a previous run at its first incomplete stage')
+    parser.add_argument('--from-summary', dest='from_summary', type=str, metavar='SUMMARY_JSON',
+                      help='Skip parsing and LLM stages and export an existing summary.json')
 
     args = parser.parse_args()
+    logging.basicConfig()
+
+    if args.resume and args.from_summary:
+        parser.error("--resume and --from-summary cannot be used together")
+    if not (args.resume or args.from_summary or args.source_path):
+        parser.error("--source_path is required unless --resume or --from-summary is given")
+
+    targets = args.exporter
+    if targets and len(targets) == 1 and targets[0]['export_path'] is None:
+        targets[0]['export_path'] = args.export_path
+    elif args.export_path and targets and len(targets) == 1:
+        parser.error("the export path was given twice, in --exporter TYPE=PATH and in --export_path")
+    elif args.export_path and targets:
+        parser.error("--export_path is ambiguous with several exporters, use TYPE=PATH instead")
+    elif args.export_path and args.resume:
+        parser.error("--export_path needs --exporter when resuming, e.g. --exporter markdown=notes.md")
+
+    if args.resume:
+        run = RunStore.open(args.runs_dir, args.resume)
+        run.update_options(targets=targets, token_budget=args.token_budget)
+        print(f"Resuming run {run.run_id} at stage: {run.first_incomplete_stage()}")
+    else:
+        run = RunStore.create(args.runs_dir, {
+            'source_path': args.source_path,
+            'targets': targets or [{'exporter': ExporterType.MARKDOWN.value, 'export_path': args.export_path}],
+            'token_budget': args.token_budget,
+        })
+        if args.from_summary:
+            run.save_summary(load_summary_file(args.from_summary))
+        print(f"Started run {run.run_id} (checkpoints in {run.run_dir})")
+
+    # The notion_api state file defaults to one next to the source deck, which a run from a summary may not have
+    if not run.options.get('source_path') and any(
+        target['exporter'] == ExporterType.NOTION_API.value and not target['export_path']
+        for target in run.pending_targets()
+    ):
+        parser.error("notion_api needs a state file path without --source_path, "
+                     "e.g. --exporter notion_api=deck.notion.json")
 
     # Initialize LLM
     llm = init_chat_model("gpt-4.1-mini", model_provider="openai", temperature=0.5)
-    content_analyzer = ContentAnalyzer()
-    presentation_processor = PresentationProcessor()
-
-    slides = presentation_processor.process_file(args.source_path)
-    analyzed_slides = content_analyzer.analyze_presentation(slides)
-
-    llm_processor = LLMProcessor(llm)
-    process_chain = llm_processor.process_presentation()
-    summary: Summary = process_chain.invoke(analyzed_slides)
-
-    
-    # Create exporter
-    exporter = ExporterFactory.get_exporter(
-        args.exporter,
-        llm=llm,
-        export_path=args.export_path
+
+    token_budget = run.options.get('token_budget')
+    llm_processor = LLMProcessor(
+        llm,
+        budgeter=TokenBudgeter(deck_budget=token_budget) if token_budget else None
     )
-    
-    # Export the summary
-    asyncio.run(exporter.export(summary))
-    print(f"Summary successfully exported to {args.export_path}")
+    summary = run_pipeline(run, llm_processor)
+
+    # Create one exporter per target that has not been exported yet
+    pending = {
+        f"{target['exporter']}:{target['export_path'] or 'default'}": target
+        for target in run.pending_targets()
+    }
+    exporters = {
+        name: ExporterFactory.get_exporter(
+            ExporterType(target['exporter']),
+            llm=llm,
+            export_path=target['export_path'],
+            source_path=run.options.get('source_path')
+        )
+        for name, target in pending.items()
+    }
+
+    # Export the summary to every target concurrently
+    errors = asyncio.run(export_all(exporters, summary))
+    for name, error in errors.items():
+        if error is None:
+            run.mark_exported(pending[name])
+            print(f"[ok]     {name}")
+        else:
+            print(f"[failed] {name}: {error}")
+            logger.error(f"Export to {name} failed", exc_info=error)
+
+    if any(errors.values()):
+        print(f"Some exports failed. Retry only those with: --resume {run.run_id}")
+        raise SystemExit(1)
+    print("Summary successfully exported to all targets")
 
 
 if __name__ == '__main__':
-    main() 
+    main()
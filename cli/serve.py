@@ -0,0 +1,56 @@
+import argparse
+from src.presentation_processor import PresentationProcessor
+from src.llm_processor import LLMProcessor
+from langchain.chat_models import init_chat_model
+from src.exporter import ExporterFactory, ExporterType
+from src.content_analyzer import ContentAnalyzer
+from src.summary_service import SummaryService, create_server
+import logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Notion Summary Automation local service')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                      help='Host to bind to')
+    parser.add_argument('--port', type=int, default=8765,
+                      help='Port to listen on')
+    parser.add_argument('--workers', type=int, default=2,
+                      help='Number of jobs processed concurrently')
+    parser.add_argument('--max_queue', type=int, default=16,
+                      help='Maximum number of queued jobs')
+    parser.add_argument('--max_history', type=int, default=1000,
+                      help='Number of finished jobs kept for status queries')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    # Everything below is created once and shared by all jobs
+    llm = init_chat_model("gpt-4.1-mini", model_provider="openai", temperature=0.5)
+    service = SummaryService(
+        presentation_processor=PresentationProcessor(),
+        content_analyzer=ContentAnalyzer(),
+        llm_processor=LLMProcessor(llm),
+        exporter_factory=lambda exporter, export_path: ExporterFactory.get_exporter(
+            ExporterType(exporter),
+            llm=llm,
+            export_path=export_path
+        ),
+        workers=args.workers,
+        max_queue=args.max_queue,
+        max_history=args.max_history,
+    )
+    service.start()
+
+    server = create_server(service, args.host, args.port)
+    print(f"Summary service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == '__main__':
+    main()
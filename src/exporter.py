@@ -1,20 +1,22 @@
 from abc import ABC, abstractmethod
 import os
 from src.llm_processor import Summary
+from src.notion_sync import NotionClient, NotionSync, default_state_path
 from langchain_core.prompts import PromptTemplate
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, AnyMessage
 from enum import Enum
-from typing import Annotated, Dict, Literal, Type, TypedDict, List, Any
+from typing import Annotated, Dict, Literal, Optional, Tuple, Type, TypedDict, List, Any
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.tools import BaseTool
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
 from mcp.client.stdio import stdio_client
 from langgraph.prebuilt import create_react_agent
-from langgraph.graph.graph import CompiledGraph
 from langgraph.graph import StateGraph, START, add_messages, MessagesState, END
 from langgraph.graph.message import add_messages
 from langgraph.types import Command
+import asyncio
 import logging
 import json
 
@@ -26,20 +28,24 @@ class Exporter(ABC):
     async def export(self, summary: Summary) -> None:
         pass
 
+    async def aclose(self) -> None:
+        """Releases resources the exporter holds on the running event loop."""
+        pass
+
 class MarkdownExporter(Exporter):
-    def __init__(self, llm: BaseChatModel, export_path: str = None):
+    def __init__(self, llm: BaseChatModel, export_path: str = None, **kwargs):
         if export_path is None:
             export_path = "summary.md"
         super().__init__(llm)
         self.export_path = export_path
 
     async def export(self, summary: Summary) -> None:
-        formatted_summary = self._format_summary(summary)
+        formatted_summary = await self._format_summary(summary)
         print(f"formatted_summary: {formatted_summary}")
         with open(self.export_path, "w") as f:
             f.write(formatted_summary)
 
-    def _format_summary(self, summary: Summary) -> str:
+    async def _format_summary(self, summary: Summary) -> str:
         prompt = """
         you are expert in markdown formatting.
         you are given a summary of a presentation.
@@ -69,7 +75,20 @@ class MarkdownExporter(Exporter):
 
         parser = StrOutputParser()
         chain = PromptTemplate.from_template(prompt) | self.llm | parser
-        return chain.invoke({"summary": summary})
+        return await chain.ainvoke({"summary": summary})
+
+
+class JsonExporter(Exporter):
+    """Writes the raw Summary as JSON, which can be exported again later with --from-summary."""
+    def __init__(self, llm: BaseChatModel, export_path: str = None, **kwargs):
+        if export_path is None:
+            export_path = "summary.json"
+        super().__init__(llm)
+        self.export_path = export_path
+
+    async def export(self, summary: Summary) -> None:
+        with open(self.export_path, "w") as f:
+            f.write(summary.model_dump_json(indent=2))
 
 
 class State(TypedDict):
@@ -84,6 +103,9 @@ class State(TypedDict):
 class NotionMcpExporter(Exporter):
     def __init__(self, llm: BaseChatModel, **kwargs):
         super().__init__(llm)
+        # One MCP session, and the agent using its tools, per event loop. The MCP server is spawned
+        # once per loop and reused by every tool call of every export on that loop.
+        self._sessions: Dict[asyncio.AbstractEventLoop, Tuple[asyncio.Task, asyncio.Event, asyncio.Future]] = {}
 
     @staticmethod
     def get_client() -> MultiServerMCPClient:
@@ -122,14 +144,7 @@ class NotionMcpExporter(Exporter):
                 verification_results={},
                 remaining_steps=40,
             )
-            client = NotionMcpExporter.get_client()
-            tools = await client.get_tools()
-
-            agent = create_react_agent(
-                model="openai:gpt-4.1-mini",
-                state_schema=State,
-                tools=tools,
-            )
+            agent = await self._get_agent()
             parent_page_id = os.getenv("NOTION_PARENT_PAGE_ID")
             initial_state["messages"] = add_messages(
                 initial_state["messages"],
@@ -147,6 +162,46 @@ class NotionMcpExporter(Exporter):
             raise
 
 
+    async def _get_agent(self):
+        loop = asyncio.get_running_loop()
+        if loop not in self._sessions:
+            ready = loop.create_future()
+            stop = asyncio.Event()
+            task = loop.create_task(self._hold_session(ready, stop))
+            self._sessions[loop] = (task, stop, ready)
+        try:
+            return await asyncio.shield(self._sessions[loop][2])
+        except Exception:
+            # Let the next export try to start the MCP server again
+            self._sessions.pop(loop, None)
+            raise
+
+    async def _hold_session(self, ready: asyncio.Future, stop: asyncio.Event) -> None:
+        # The session is opened and closed by this one task, because the MCP stdio transport
+        # must exit its cancel scopes in the task that entered them
+        try:
+            async with NotionMcpExporter.get_client().session("notion-mcp") as session:
+                tools = await load_mcp_tools(session)
+                ready.set_result(create_react_agent(
+                    model="openai:gpt-4.1-mini",
+                    state_schema=State,
+                    tools=tools,
+                ))
+                await stop.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logging.getLogger(__name__).error(f"Notion MCP session failed: {e}")
+
+    async def aclose(self) -> None:
+        """Closes the MCP session of the running event loop, stopping its server."""
+        entry = self._sessions.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            task, stop, _ = entry
+            stop.set()
+            await task
+
     def _prompt_for_notion_mcp(self, summary: Summary, parent_page_id: str) -> str:
         prompt = f"""You are a Notion API expert. Follow these exact steps to create and format a Notion page:
                 1. Create Page (First Step):
@@ -179,18 +234,70 @@ class NotionMcpExporter(Exporter):
         return prompt
 
 
+class NotionApiExporter(Exporter):
+    """
+    Exports to Notion through the REST API without an agent.
+    The block mapping is stored at export_path, so re-exporting the same deck only sends the changed blocks.
+    Without an export_path, the mapping is stored next to the source deck.
+    """
+    def __init__(self, llm: BaseChatModel, export_path: str = None, source_path: str = None, **kwargs):
+        if export_path is None:
+            if source_path is None:
+                raise ValueError("The notion_api exporter needs an export path when there is no source file")
+            export_path = default_state_path(source_path)
+        super().__init__(llm)
+        self.export_path = export_path
+
+    async def export(self, summary: Summary) -> None:
+        parent_page_id = os.getenv("NOTION_PARENT_PAGE_ID")
+        if not parent_page_id:
+            raise ValueError("NOTION_PARENT_PAGE_ID environment variable is required")
+        client = NotionClient()
+        sync = NotionSync(client, self.export_path)
+        state = await asyncio.to_thread(sync.sync, summary, parent_page_id)
+        print(f"Notion page {state.page_id} synced with {client.request_count} requests")
+
+
 class ExporterType(Enum):
     MARKDOWN = "markdown"
     NOTION_MCP = "notion_mcp"
+    NOTION_API = "notion_api"
+    JSON = "json"
 
 class ExporterFactory:
     _exporters: Dict[ExporterType, Type[Exporter]] = {
         ExporterType.MARKDOWN: MarkdownExporter,
-        ExporterType.NOTION_MCP: NotionMcpExporter
+        ExporterType.NOTION_MCP: NotionMcpExporter,
+        ExporterType.NOTION_API: NotionApiExporter,
+        ExporterType.JSON: JsonExporter
     }
 
     @classmethod
     def get_exporter(cls, exporter_type: ExporterType, **kwargs) -> Exporter:
         if exporter_type not in cls._exporters:
             raise ValueError(f"Exporter type '{exporter_type}' not supported. Available exporters: {list(cls._exporters.keys())}")
-        return cls._exporters[exporter_type](**kwargs)
\ No newline at end of file
+        return cls._exporters[exporter_type](**kwargs)
+
+
+async def export_all(exporters: Dict[str, Exporter], summary: Summary) -> Dict[str, Optional[BaseException]]:
+    """
+    Runs several exporters concurrently on the same summary.
+
+    Args:
+        exporters: Exporters keyed by a target name used in the report
+        summary: Summary to export
+
+    Returns:
+        The error raised by each target, or None for targets that succeeded
+    """
+    try:
+        results = await asyncio.gather(
+            *(exporter.export(summary) for exporter in exporters.values()),
+            return_exceptions=True
+        )
+    finally:
+        await asyncio.gather(*(exporter.aclose() for exporter in exporters.values()), return_exceptions=True)
+    return {
+        name: result if isinstance(result, BaseException) else None
+        for name, result in zip(exporters, results)
+    }
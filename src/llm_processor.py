@@ -1,14 +1,31 @@
 from src.content_analyzer import AnalyzedContent
-from typing import List, Dict, Any, Optional
-from langchain_core.runnables import Runnable, RunnableSequence
+from typing import List, Dict, Any, Optional, Tuple, Type, TYPE_CHECKING
+from langchain_core.runnables import Runnable, RunnableLambda, RunnableSequence
 from langchain_core.messages import HumanMessage, SystemMessage
-from pydantic import BaseModel
+from langchain_core.utils.json import parse_partial_json
+from pydantic import BaseModel, ValidationError
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain.chat_models import init_chat_model
 from langchain_core.language_models.chat_models import BaseChatModel
 import getpass
+import json
+import logging
 import os
+import re
+
+if TYPE_CHECKING:
+    from src.token_budget import BudgetReport, TokenBudgeter, TopicBudget
+
+try:
+    from openai import LengthFinishReasonError
+except ImportError:
+    LengthFinishReasonError = None
+
+# Raised from inside the model call by providers that validate structured output themselves
+STRUCTURED_OUTPUT_ERRORS: Tuple[Type[Exception], ...] = (ValidationError,) + (
+    (LengthFinishReasonError,) if LengthFinishReasonError is not None else ()
+)
 
 class Concept(BaseModel):
     topic: str
@@ -29,8 +46,22 @@ class Summary(BaseModel):
     topics: List[TopicSummary]
 
 class LLMProcessor:
-    def __init__(self, base_model: BaseChatModel):
+    def __init__(self, base_model: BaseChatModel, max_repair_rounds: int = 2,
+                 budgeter: Optional["TokenBudgeter"] = None, max_concurrency: int = 8):
+        """
+        Args:
+            base_model: Chat model used by all chains
+            max_repair_rounds: How many times invalid or missing entries of a structured output are
+                re-requested before giving up
+            budgeter: If given, each topic is summarized in its own call with an output token budget
+                derived from its source slides
+            max_concurrency: Maximum number of topic calls running at once when budgeting
+        """
         self.llm = base_model
+        self.max_repair_rounds = max_repair_rounds
+        self.budgeter = budgeter
+        self.max_concurrency = max_concurrency
+        self.logger = logging.getLogger(__name__)
 
     def process_presentation(self) -> RunnableSequence:
         """
@@ -40,9 +71,100 @@ class LLMProcessor:
         concepts_chain = self.concepts_chain
         # Create a chain that takes concepts and returns summary
         summary_chain = self.summary_chain
+        # Budgeted summaries need the slides as well as the concepts
+        if self.budgeter is not None:
+            return RunnableLambda(lambda analyzed_slides: self.summarize(
+                self.extract_concepts(analyzed_slides), analyzed_slides
+            ))
         # Compose the chains together
         return RunnableSequence(concepts_chain, summary_chain)
 
+    def extract_concepts(self, analyzed_slides: List[AnalyzedContent]) -> Concepts:
+        """
+        Run only the concepts stage, so its result can be checkpointed.
+        """
+        return self.concepts_chain(analyzed_slides).invoke(analyzed_slides)
+
+    def summarize(self, concepts: Concepts, analyzed_slides: Optional[List[AnalyzedContent]] = None) -> Summary:
+        """
+        Run only the summary stage, so its result can be checkpointed.
+        Topics are budgeted when a budgeter is configured and the source slides are given.
+        """
+        if self.budgeter is not None and analyzed_slides is not None:
+            summary, report = self.summarize_with_budget(concepts, analyzed_slides)
+            self.logger.info(f"Output token budget:\n{report.format()}")
+            return summary
+        return self.summary_chain(concepts).invoke(concepts)
+
+    def summarize_with_budget(self, concepts: Concepts,
+                              analyzed_slides: List[AnalyzedContent]) -> Tuple[Summary, "BudgetReport"]:
+        """
+        Summarize each topic in its own call, limited to the output tokens its source slides justify.
+
+        Returns:
+            The summary and a report of planned against used output tokens per topic
+        """
+        if self.budgeter is None:
+            raise ValueError("summarize_with_budget requires a budgeter")
+        report = self.budgeter.plan(concepts, analyzed_slides)
+        topics = RunnableLambda(lambda pair: self._summarize_topic(*pair)).batch(
+            list(zip(concepts.concepts, report.topics)),
+            config={"max_concurrency": self.max_concurrency}
+        )
+        return Summary(topics=topics), report
+
+    def _summarize_topic(self, concept: Concept, budget: "TopicBudget") -> TopicSummary:
+        system_message = """You are an expert university lecturer writing study notes for students.
+            Teach the concept below so a student encountering it for the first time understands it, not just memorizes it.
+
+            Guidelines:
+            1. detailed_explanation: Explain the concept in the teaching style that best conveys it.
+            2. summary: A concise recap of the essential idea a student must take away.
+            3. examples: Worked examples where relevant (especially for math, algorithms, or processes).
+            4. key_terms: Any new vocabulary or notation introduced, with brief definitions.
+            5. key_insights: The most important non-obvious takeaways a student might miss.
+            6. Format all mathematical expressions using LaTeX notation:
+               - Use $...$ for inline math
+               - Use $$...$$ for display math
+
+            Length: {length_guidance}
+
+            Here is the concept to summarize:
+            {concept}
+            """
+        prompt = PromptTemplate.from_template(system_message)
+        max_tokens = budget.max_tokens
+
+        for attempt in range(self.max_repair_rounds + 1):
+            # The last attempt is not capped, so a topic that keeps overflowing its budget cannot fail the deck
+            last = attempt == self.max_repair_rounds
+            model = _structured(self.llm if last else _with_max_tokens(self.llm, max_tokens), TopicSummary)
+            try:
+                output = (prompt | model).invoke({"length_guidance": budget.guidance(), "concept": concept})
+            except STRUCTURED_OUTPUT_ERRORS as e:
+                completion = getattr(e, "completion", None)
+                if completion is not None and completion.usage:
+                    budget.used_tokens = (budget.used_tokens or 0) + completion.usage.completion_tokens
+                truncated = LengthFinishReasonError is not None and isinstance(e, LengthFinishReasonError)
+            else:
+                usage = getattr(output.get("raw"), "usage_metadata", None)
+                if usage:
+                    budget.used_tokens = (budget.used_tokens or 0) + usage["output_tokens"]
+                if output["parsing_error"] is None and output["parsed"] is not None:
+                    return output["parsed"]
+                _, truncated = _raw_payload(output)
+
+            if last:
+                break
+            # Output cut off at max_tokens gets more room on the retry, invalid output is requested again as is
+            if truncated:
+                self.logger.warning(f"Topic '{concept.topic}' did not fit in {max_tokens} tokens, retrying")
+                max_tokens = int(max_tokens * 1.5)
+            else:
+                self.logger.warning(f"Topic '{concept.topic}' returned an invalid summary, retrying")
+
+        raise ValueError(f"Could not summarize topic '{concept.topic}'")
+
     def concepts_chain(self, analyzed_slides: List[AnalyzedContent]) -> Runnable:
         """
         Extract the concepts from the analyzed slides using the LLM, grouped by topic.
@@ -66,9 +188,10 @@ class LLMProcessor:
             {analyzed_slides}
             """
 
-        model = self.llm.with_structured_output(Concepts)
+        model = _structured(self.llm, Concepts)
         prompt = PromptTemplate.from_template(system_message)
-        chain = prompt | model
+        raw_chain = prompt | model
+        chain = raw_chain | RunnableLambda(lambda output: self._salvage_concepts(output, analyzed_slides, raw_chain))
         return chain
 
     def summary_chain(self, concepts: Concepts) -> Runnable:
@@ -98,8 +221,208 @@ class LLMProcessor:
             {concepts}
             """
         
-        model = self.llm.with_structured_output(Summary)
+        model = _structured(self.llm, Summary)
         prompt = PromptTemplate.from_template(system_message)
-        chain = prompt | model
+        raw_chain = prompt | model
+        chain = raw_chain | RunnableLambda(lambda output: self._salvage_summary(output, concepts, raw_chain))
         return chain
 
+    def _salvage_concepts(self, output: Dict[str, Any], analyzed_slides: List[AnalyzedContent],
+                          raw_chain: Runnable) -> Concepts:
+        """
+        Keeps the concepts that validated and re-requests only the broken ones, plus the rest of the
+        list if the output was cut off. An output without a concepts list is requested again as a whole.
+        """
+        if output["parsing_error"] is None and output["parsed"] is not None:
+            return output["parsed"]
+
+        recovered = _payload_items(output, "concepts")
+        for _ in range(self.max_repair_rounds):
+            if recovered is not None:
+                break
+            self.logger.warning("Structured output has no concepts list, requesting all concepts again")
+            output = raw_chain.invoke(analyzed_slides)
+            if output["parsing_error"] is None and output["parsed"] is not None:
+                return output["parsed"]
+            recovered = _payload_items(output, "concepts")
+        if recovered is None:
+            raise output["parsing_error"] or ValueError("Model returned no structured output for concepts")
+        items, truncated = recovered
+        slots = _validate_items(items, Concept, truncated)
+
+        system_message = """You are an expert educational content analyzer and concept extractor.
+            A previous extraction of concepts from the slides below was partly invalid.
+            {broken_instructions}
+            {continuation_instructions}
+            Return only these concepts, each with its topic and key_ideas, in the order requested.
+            Format all mathematical expressions using LaTeX notation ($...$ inline, $$...$$ display).
+
+            Here are the slides:
+            {analyzed_slides}
+            """
+        model = _structured(self.llm, Concepts)
+        repair_chain = PromptTemplate.from_template(system_message) | model
+
+        for _ in range(self.max_repair_rounds):
+            broken = [index for index, slot in enumerate(slots) if not isinstance(slot, Concept)]
+            if not broken and not truncated:
+                break
+            self.logger.warning(f"Repairing {len(broken)} invalid concepts{' and a truncated list' if truncated else ''}")
+
+            broken_entries = json.dumps([slots[index] for index in broken], ensure_ascii=False)
+            done_topics = [slot.topic for slot in slots if isinstance(slot, Concept)]
+            repair_output = repair_chain.invoke({
+                "broken_instructions": f"Complete these incomplete entries: {broken_entries}" if broken else "",
+                "continuation_instructions": (
+                    f"The list was cut off. After the entries above, add the concepts for the slides not covered "
+                    f"by these topics: {done_topics}" if truncated else ""
+                ),
+                "analyzed_slides": analyzed_slides,
+            })
+            repair_recovered = _payload_items(repair_output, "concepts")
+            if repair_recovered is None:
+                continue
+            repair_items, repair_truncated = repair_recovered
+            repaired = _validate_items(repair_items, Concept, repair_truncated)
+
+            # Repaired entries come first, in the order requested; anything after them continues the list
+            for index, item in zip(broken, repaired):
+                if isinstance(item, Concept):
+                    slots[index] = item
+            if truncated:
+                slots.extend(repaired[len(broken):])
+                truncated = repair_truncated
+
+        if truncated or any(not isinstance(slot, Concept) for slot in slots):
+            raise ValueError("Could not repair the structured concepts output")
+        return Concepts(concepts=slots)
+
+    def _salvage_summary(self, output: Dict[str, Any], concepts: Concepts, raw_chain: Runnable) -> Summary:
+        """
+        Keeps the topic summaries that validated and re-requests only the concepts whose summary
+        was invalid or missing. An output without a topics list leaves every concept to re-request.
+        """
+        if output["parsing_error"] is None and output["parsed"] is not None:
+            return output["parsed"]
+
+        items, truncated = _payload_items(output, "topics") or ([], False)
+        matched, extras = _match_topics(_validate_items(items, TopicSummary, truncated), concepts.concepts)
+
+        for _ in range(self.max_repair_rounds):
+            missing = [index for index in range(len(concepts.concepts)) if index not in matched]
+            if not missing:
+                break
+            self.logger.warning(f"Re-requesting summaries for {len(missing)} of {len(concepts.concepts)} topics")
+
+            repair_output = raw_chain.invoke(Concepts(concepts=[concepts.concepts[index] for index in missing]))
+            if repair_output["parsing_error"] is None and repair_output["parsed"] is not None:
+                items = repair_output["parsed"].topics
+            else:
+                repair_items, repair_truncated = _payload_items(repair_output, "topics") or ([], False)
+                items = _validate_items(repair_items, TopicSummary, repair_truncated)
+            repaired, _ = _match_topics(items, [concepts.concepts[index] for index in missing])
+            for position, topic_summary in repaired.items():
+                matched[missing[position]] = topic_summary
+
+        if len(matched) < len(concepts.concepts):
+            raise ValueError("Could not repair the structured summary output")
+        return Summary(topics=[matched[index] for index in range(len(concepts.concepts))] + extras)
+
+
+def _structured(llm: BaseChatModel, schema: Type[BaseModel]) -> Runnable:
+    """
+    Requests the schema as a forced tool call, returning the raw message along with the parse result.
+
+    OpenAI's default json_schema mode raises inside the model call when the output is cut off or fails
+    validation, losing the raw response. With tool calling both reach the parser: invalid arguments
+    become a parsing_error and truncated ones an invalid tool call, so the valid part can be salvaged.
+    """
+    return llm.with_structured_output(schema, method="function_calling", include_raw=True)
+
+def _with_max_tokens(llm: BaseChatModel, max_tokens: int) -> BaseChatModel:
+    """Returns a copy of the model limited to max_tokens output tokens, if the model supports the setting."""
+    if "max_tokens" in getattr(type(llm), "model_fields", {}):
+        return llm.model_copy(update={"max_tokens": max_tokens})
+    return llm
+
+def _raw_payload(output: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Recovers the raw arguments of a structured output call whose result failed validation.
+
+    Returns:
+        The (possibly partial) payload, or None if nothing could be recovered, and whether it was truncated
+    """
+    raw = output.get("raw")
+    if raw is None:
+        return None, False
+    if getattr(raw, "tool_calls", None):
+        return raw.tool_calls[0]["args"], False
+    if getattr(raw, "invalid_tool_calls", None):
+        text = raw.invalid_tool_calls[0].get("args") or ""
+    elif isinstance(raw.content, str):
+        text = raw.content
+    else:
+        return None, False
+
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError:
+        payload = parse_partial_json(text)
+        return (payload, True) if isinstance(payload, dict) else (None, False)
+
+def _payload_items(output: Dict[str, Any], key: str) -> Optional[Tuple[List[Any], bool]]:
+    """
+    Recovers the list under key from a failed structured output.
+
+    Returns:
+        The items and whether the payload was truncated, or None if the payload has no such list
+    """
+    payload, truncated = _raw_payload(output)
+    items = payload.get(key) if isinstance(payload, dict) else None
+    return (items, truncated) if isinstance(items, list) else None
+
+def _validate_items(items: List[Any], model: Type[BaseModel], truncated: bool = False) -> List[Any]:
+    """
+    Validates each item on its own, returning model instances for valid items and the raw item otherwise.
+    The last item of a truncated output is never trusted, since its text may have been cut off mid-value.
+    """
+    validated = []
+    for item in items:
+        try:
+            validated.append(model.model_validate(item))
+        except ValidationError:
+            validated.append(item)
+    if truncated and validated:
+        validated[-1] = items[-1]
+    return validated
+
+def _normalize_topic(topic: Any) -> str:
+    return re.sub(r'[^a-z0-9]', '', str(topic).lower())
+
+def _match_topics(items: List[Any], concepts: List[Concept]) -> Tuple[Dict[int, TopicSummary], List[TopicSummary]]:
+    """
+    Assigns valid topic summaries to concepts, by topic name first and by position otherwise.
+
+    Returns:
+        Topic summaries keyed by concept index, and valid summaries that matched no concept
+    """
+    concept_index = {_normalize_topic(concept.topic): index for index, concept in enumerate(concepts)}
+    matched: Dict[int, TopicSummary] = {}
+    unmatched = []
+    for position, item in enumerate(items):
+        if not isinstance(item, TopicSummary):
+            continue
+        index = concept_index.get(_normalize_topic(item.topic))
+        if index is not None and index not in matched:
+            matched[index] = item
+        else:
+            unmatched.append((position, item))
+
+    extras = []
+    for position, item in unmatched:
+        if position < len(concepts) and position not in matched:
+            matched[position] = item
+        else:
+            extras.append(item)
+    return matched, extras
+
@@ -0,0 +1,311 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass, field, asdict
+from difflib import SequenceMatcher
+from src.llm_processor import Summary, TopicSummary
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+
+# Notion rejects rich text objects longer than this and requests with more than 100 children
+MAX_TEXT_LENGTH = 2000
+MAX_BLOCKS_PER_REQUEST = 100
+
+INLINE_MATH_PATTERN = re.compile(r'(?<!\$)\$([^$\n]+?)\$(?!\$)')
+
+class NotionClient:
+    """Minimal Notion REST API client covering the calls needed to sync a page."""
+
+    def __init__(self, token: Optional[str] = None, notion_version: Optional[str] = None,
+                 base_url: str = "https://api.notion.com/v1", max_retries: int = 5, backoff: float = 1.0):
+        """
+        Args:
+            token: Integration token, defaults to the NOTION_TOKEN environment variable
+            notion_version: API version, defaults to NOTION_VERSION or 2022-06-28
+            base_url: API root URL
+            max_retries: Retries of a request rate limited with HTTP 429
+            backoff: Seconds to wait before the first retry when the response has no Retry-After header
+        """
+        token = token or os.getenv("NOTION_TOKEN")
+        if not token:
+            raise ValueError("NOTION_TOKEN environment variable is required")
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Notion-Version": notion_version or os.getenv("NOTION_VERSION", "2022-06-28"),
+            "Content-Type": "application/json",
+        }
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.logger = logging.getLogger(__name__)
+        self.request_count = 0
+
+    def create_page(self, parent_page_id: str, title: str) -> str:
+        """Creates an empty page and returns its ID."""
+        page = self._request("POST", "/pages", {
+            "parent": {"page_id": parent_page_id},
+            "properties": {"title": {"title": _rich_text(title)}},
+        })
+        return page["id"]
+
+    def update_page_title(self, page_id: str, title: str) -> None:
+        self._request("PATCH", f"/pages/{page_id}", {"properties": {"title": {"title": _rich_text(title)}}})
+
+    def append_blocks(self, parent_id: str, blocks: List[Dict[str, Any]], after: Optional[str] = None) -> List[str]:
+        """Appends blocks to a parent, optionally after a given block, and returns the new block IDs."""
+        body: Dict[str, Any] = {"children": blocks}
+        if after:
+            body["after"] = after
+        response = self._request("PATCH", f"/blocks/{parent_id}/children", body)
+        # The response lists the parent's children; the new blocks are the ones right after the anchor
+        ids = [result["id"] for result in response["results"]]
+        start = ids.index(after) + 1 if after in ids else len(ids) - len(blocks)
+        return ids[start:start + len(blocks)]
+
+    def update_block(self, block_id: str, block: Dict[str, Any]) -> None:
+        block_type = block["type"]
+        self._request("PATCH", f"/blocks/{block_id}", {block_type: block[block_type]})
+
+    def archive_block(self, block_id: str) -> None:
+        self._request("DELETE", f"/blocks/{block_id}")
+
+    def _request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        data = json.dumps(body).encode() if body is not None else None
+        for attempt in range(self.max_retries + 1):
+            self.request_count += 1
+            request = urllib.request.Request(f"{self.base_url}{path}", data=data, headers=self.headers, method=method)
+            try:
+                with urllib.request.urlopen(request) as response:
+                    return json.load(response)
+            except urllib.error.HTTPError as e:
+                if e.code != 429 or attempt == self.max_retries:
+                    raise
+                # Notion rate limits to about three requests per second and says when to come back
+                delay = float(e.headers.get("Retry-After") or self.backoff * 2 ** attempt)
+                self.logger.warning(f"Notion rate limit hit on {method} {path}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+
+@dataclass
+class SyncedBlock:
+    """A block rendered from the summary and the Notion block it was exported to."""
+    key: str
+    content_hash: str
+    block_type: str
+    block_id: str
+
+@dataclass
+class NotionSyncState:
+    """Mapping from summary sections to exported Notion block IDs, persisted between exports."""
+    page_id: str
+    title: str
+    blocks: List[SyncedBlock] = field(default_factory=list)
+    parent_page_id: Optional[str] = None
+
+    @property
+    def block_ids(self) -> List[str]:
+        return [block.block_id for block in self.blocks]
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional["NotionSyncState"]:
+        path = Path(path)
+        if not path.exists():
+            return None
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls(page_id=data["page_id"], title=data["title"],
+                   blocks=[SyncedBlock(**block) for block in data["blocks"]],
+                   parent_page_id=data.get("parent_page_id"))
+
+    def save(self, path: Union[str, Path]) -> None:
+        # Write to a temp file and rename so a failure while saving never leaves a truncated mapping
+        path = Path(path)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(asdict(self), f, indent=2)
+        tmp_path.replace(path)
+
+
+@dataclass
+class RenderedBlock:
+    key: str
+    block: Dict[str, Any]
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(json.dumps(self.block, sort_keys=True).encode()).hexdigest()[:16]
+
+    @property
+    def block_type(self) -> str:
+        return self.block["type"]
+
+
+def page_title(summary: Summary) -> str:
+    """Default page title: the first topic of the summary."""
+    return summary.topics[0].topic if summary.topics else "Summary"
+
+def default_state_path(source_path: Union[str, Path]) -> Path:
+    """
+    State file for a deck exported without an explicit path: next to the source file, e.g. lecture.notion.json
+    for lecture.pptx. It is keyed on the deck rather than the summary, whose topics change between runs.
+    """
+    return Path(source_path).with_suffix(".notion.json")
+
+def summary_to_blocks(summary: Summary) -> List[RenderedBlock]:
+    """
+    Renders a summary as a flat list of Notion blocks.
+
+    Each block gets a key naming the summary section it comes from (topic and field), so a
+    re-export can tell which section a changed block belongs to. The page starts with a table
+    of contents block, which never changes and anchors insertions at the top of the page.
+    """
+    blocks = [RenderedBlock("toc", {"type": "table_of_contents", "table_of_contents": {}})]
+    for topic in summary.topics:
+        blocks.extend(_topic_to_blocks(topic))
+    return blocks
+
+def _topic_to_blocks(topic: TopicSummary) -> List[RenderedBlock]:
+    prefix = topic.topic
+    blocks = [
+        RenderedBlock(f"{prefix}/topic", _block("heading_2", topic.topic)),
+        RenderedBlock(f"{prefix}/summary", _block("paragraph", topic.summary)),
+    ]
+    if topic.detailed_explanation:
+        blocks.append(RenderedBlock(f"{prefix}/detailed_explanation/heading", _block("heading_3", "Explanation")))
+        for paragraph in topic.detailed_explanation.split("\n\n"):
+            if paragraph.strip():
+                blocks.append(RenderedBlock(f"{prefix}/detailed_explanation", _block("paragraph", paragraph.strip())))
+    for field_name, heading in (("examples", "Examples"), ("key_terms", "Key terms"), ("key_insights", "Key insights")):
+        items = getattr(topic, field_name)
+        if items:
+            blocks.append(RenderedBlock(f"{prefix}/{field_name}/heading", _block("heading_3", heading)))
+            for item in items:
+                blocks.append(RenderedBlock(f"{prefix}/{field_name}", _block("bulleted_list_item", item)))
+    return blocks
+
+def _block(block_type: str, text: str) -> Dict[str, Any]:
+    return {"type": block_type, block_type: {"rich_text": _rich_text(text)}}
+
+def _rich_text(text: str) -> List[Dict[str, Any]]:
+    """Converts text to Notion rich text, turning $...$ into inline equations and splitting long runs."""
+    rich_text = []
+    position = 0
+    for match in INLINE_MATH_PATTERN.finditer(text):
+        rich_text.extend(_text_objects(text[position:match.start()]))
+        rich_text.append({"type": "equation", "equation": {"expression": match.group(1)}})
+        position = match.end()
+    rich_text.extend(_text_objects(text[position:]))
+    return rich_text
+
+def _text_objects(text: str) -> List[Dict[str, Any]]:
+    return [
+        {"type": "text", "text": {"content": text[i:i + MAX_TEXT_LENGTH]}}
+        for i in range(0, len(text), MAX_TEXT_LENGTH)
+    ]
+
+
+class NotionSync:
+    """
+    Exports a summary to a Notion page and keeps it up to date on re-export.
+
+    The first export creates the page. Later exports diff the newly rendered blocks against the
+    stored mapping and only update, insert or archive the blocks that changed, so the number of
+    API requests follows the size of the change rather than the size of the summary.
+    """
+
+    def __init__(self, client: NotionClient, state_path: Union[str, Path]):
+        self.client = client
+        self.state_path = Path(state_path)
+        self.logger = logging.getLogger(__name__)
+
+    def sync(self, summary: Summary, parent_page_id: str, title: Optional[str] = None) -> NotionSyncState:
+        """
+        Creates or updates the page for the summary and persists the block mapping.
+
+        The mapping is saved even when a request fails midway, so it always matches the page and
+        the next sync picks up where this one stopped.
+
+        Returns:
+            The updated sync state
+
+        Raises:
+            ValueError: If the state file belongs to a page under a different parent
+        """
+        title = title or page_title(summary)
+        rendered = summary_to_blocks(summary)
+        state = NotionSyncState.load(self.state_path)
+
+        if state is None:
+            state = NotionSyncState(page_id=self.client.create_page(parent_page_id, title), title=title,
+                                    parent_page_id=parent_page_id)
+        elif state.parent_page_id not in (None, parent_page_id):
+            raise ValueError(
+                f"{self.state_path} tracks a page under parent {state.parent_page_id}, not {parent_page_id}; "
+                f"use another state file for this export"
+            )
+
+        try:
+            if state.title != title:
+                self.client.update_page_title(state.page_id, title)
+                state.title = title
+            state.parent_page_id = parent_page_id
+            self._apply_diff(state, rendered)
+        finally:
+            state.save(self.state_path)
+        return state
+
+    def _apply_diff(self, state: NotionSyncState, rendered: List[RenderedBlock]) -> None:
+        """Updates the page to the rendered blocks and state.blocks to the blocks now on the page."""
+        old = state.blocks
+        old_signatures = [(block.key, block.content_hash) for block in old]
+        new_signatures = [(block.key, block.content_hash) for block in rendered]
+        matcher = SequenceMatcher(a=old_signatures, b=new_signatures, autojunk=False)
+
+        # Old blocks are handled strictly in page order, so at any point the page holds the synced
+        # blocks followed by the old blocks not consumed yet
+        synced: List[SyncedBlock] = []
+        consumed = 0
+        try:
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == "equal":
+                    synced.extend(old[i1:i2])
+                    consumed = i2
+                    continue
+
+                # Changed blocks of the same type are updated in place, the rest is archived or inserted
+                pending: List[RenderedBlock] = []
+                old_run = old[i1:i2]
+                for offset, new_block in enumerate(rendered[j1:j2]):
+                    if offset < len(old_run) and old_run[offset].block_type == new_block.block_type and not pending:
+                        self.client.update_block(old_run[offset].block_id, new_block.block)
+                        synced.append(SyncedBlock(new_block.key, new_block.content_hash,
+                                                  new_block.block_type, old_run[offset].block_id))
+                        consumed += 1
+                    else:
+                        pending.append(new_block)
+                reused = len(rendered[j1:j2]) - len(pending)
+                for old_block in old_run[reused:]:
+                    self.client.archive_block(old_block.block_id)
+                    consumed += 1
+                if pending:
+                    after = synced[-1].block_id if synced else None
+                    self._insert(state.page_id, after, pending, synced)
+        finally:
+            state.blocks = synced + old[consumed:]
+
+        self.logger.info(f"Synced Notion page {state.page_id} with {self.client.request_count} requests")
+
+    def _insert(self, page_id: str, after: Optional[str], blocks: List[RenderedBlock],
+                synced: List[SyncedBlock]) -> None:
+        """Inserts blocks after a given block, appending each batch to synced as soon as it is created."""
+        for start in range(0, len(blocks), MAX_BLOCKS_PER_REQUEST):
+            batch = blocks[start:start + MAX_BLOCKS_PER_REQUEST]
+            block_ids = self.client.append_blocks(page_id, [block.block for block in batch], after=after)
+            for block, block_id in zip(batch, block_ids):
+                synced.append(SyncedBlock(block.key, block.content_hash, block.block_type, block_id))
+            after = block_ids[-1]
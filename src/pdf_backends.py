@@ -0,0 +1,166 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Type
+import importlib.util
+
+class PdfBackend(ABC):
+    """Extracts the text of every page of a PDF file."""
+
+    # Module that must be importable for the backend to be used
+    module: str
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return importlib.util.find_spec(cls.module) is not None
+
+    @abstractmethod
+    def extract_pages(self, file_path: Path) -> List[str]:
+        """Returns the text of each page in page order."""
+        pass
+
+class PyMuPdfBackend(PdfBackend):
+    """PyMuPDF (MuPDF bindings). Orders lines by layout, which keeps slide text and columns in reading order."""
+    module = "pymupdf"
+
+    # Layout ordering is cubic in the number of lines; denser pages are read top to bottom, left to right
+    MAX_LAYOUT_LINES = 60
+
+    def extract_pages(self, file_path: Path) -> List[str]:
+        import pymupdf
+        with pymupdf.open(file_path) as document:
+            return [self._page_text(page.get_text("words")) for page in document]
+
+    @classmethod
+    def _page_text(cls, words: List[tuple]) -> str:
+        # Words are (x0, y0, x1, y1, text, block_no, line_no, word_no). Grouping them into lines and ordering
+        # those is an order of magnitude faster than get_text(sort=True), which also interleaves columns.
+        grouped: Dict[Tuple[int, int], List[tuple]] = {}
+        for word in words:
+            grouped.setdefault((word[5], word[6]), []).append(word)
+        lines = [
+            (min(w[0] for w in line), min(w[1] for w in line), max(w[2] for w in line), max(w[3] for w in line),
+             ' '.join(w[4] for w in sorted(line, key=lambda w: w[0])))
+            for line in grouped.values()
+        ]
+        if len(lines) > cls.MAX_LAYOUT_LINES:
+            ordered = sorted(lines, key=lambda line: (round(line[1]), line[0]))
+        else:
+            ordered = _reading_order(lines)
+        return '\n'.join(line[4] for line in ordered)
+
+class PdfiumBackend(PdfBackend):
+    """pypdfium2 (PDFium bindings)."""
+    module = "pypdfium2"
+
+    def extract_pages(self, file_path: Path) -> List[str]:
+        import pypdfium2
+        document = pypdfium2.PdfDocument(file_path)
+        try:
+            pages = []
+            for page in document:
+                text_page = page.get_textpage()
+                pages.append(text_page.get_text_range().replace('\r\n', '\n'))
+                text_page.close()
+                page.close()
+            return pages
+        finally:
+            document.close()
+
+class PypdfBackend(PdfBackend):
+    """pypdf, the maintained pure-Python successor of PyPDF2."""
+    module = "pypdf"
+
+    def extract_pages(self, file_path: Path) -> List[str]:
+        import pypdf
+        with open(file_path, 'rb') as file:
+            return [page.extract_text() for page in pypdf.PdfReader(file).pages]
+
+class PyPDF2Backend(PdfBackend):
+    """PyPDF2, always installed with the project."""
+    module = "PyPDF2"
+
+    def extract_pages(self, file_path: Path) -> List[str]:
+        import PyPDF2
+        with open(file_path, 'rb') as file:
+            return [page.extract_text() for page in PyPDF2.PdfReader(file).pages]
+
+class PdfBackendFactory:
+    # Ordered by preference: text ordering quality first, then speed
+    _backends: Dict[str, Type[PdfBackend]] = {
+        "pymupdf": PyMuPdfBackend,
+        "pdfium": PdfiumBackend,
+        "pypdf": PypdfBackend,
+        "pypdf2": PyPDF2Backend,
+    }
+
+    @classmethod
+    def available(cls) -> List[str]:
+        return [name for name, backend in cls._backends.items() if backend.is_available()]
+
+    @classmethod
+    def get_backend(cls, name: str) -> PdfBackend:
+        if name not in cls._backends:
+            raise ValueError(f"PDF backend '{name}' not supported. Available backends: {list(cls._backends.keys())}")
+        if not cls._backends[name].is_available():
+            raise ValueError(f"PDF backend '{name}' requires the '{cls._backends[name].module}' package")
+        return cls._backends[name]()
+
+    @classmethod
+    def select(cls, name: Optional[str] = None) -> List[PdfBackend]:
+        """
+        Returns the backends to try, best first.
+
+        Args:
+            name: Backend to use instead of automatic selection
+
+        Returns:
+            List of installed backends; later entries are fallbacks if an earlier one fails on a file
+        """
+        if name is not None:
+            return [cls.get_backend(name)]
+        return [cls._backends[available]() for available in cls.available()]
+
+
+def _reading_order(lines: List[tuple]) -> List[tuple]:
+    """
+    Orders (x0, y0, x1, y1, text) lines for reading, keeping columns together.
+
+    A line precedes another if it is above it and they overlap horizontally, or if it lies entirely to
+    its left and no line between them vertically overlaps both, which would mean they are in different
+    rows rather than columns. Lines are then taken in that order, top to bottom and left to right
+    among the lines whose predecessors have all been taken.
+    """
+    def overlaps(a: tuple, b: tuple) -> bool:
+        return a[0] < b[2] and b[0] < a[2]
+
+    def precedes(a: tuple, b: tuple) -> bool:
+        if overlaps(a, b):
+            return (a[1], a[0]) < (b[1], b[0])
+        if a[2] > b[0]:
+            return False
+        top, bottom = min(a[3], b[3]), max(a[1], b[1])
+        return not any(
+            top <= c[1] and c[3] <= bottom and overlaps(c, a) and overlaps(c, b)
+            for c in lines if c is not a and c is not b
+        )
+
+    count = len(lines)
+    successors: List[List[int]] = [[] for _ in range(count)]
+    predecessors = [0] * count
+    for i in range(count):
+        for j in range(count):
+            if i != j and precedes(lines[i], lines[j]):
+                successors[i].append(j)
+                predecessors[j] += 1
+
+    remaining = set(range(count))
+    ordered = []
+    while remaining:
+        # Every line with no pending predecessor could come next; a cycle is broken by taking any line
+        ready = [i for i in remaining if predecessors[i] == 0] or list(remaining)
+        index = min(ready, key=lambda i: (round(lines[i][1]), lines[i][0]))
+        remaining.remove(index)
+        ordered.append(lines[index])
+        for successor in successors[index]:
+            predecessors[successor] -= 1
+    return ordered
@@ -1,9 +1,19 @@
 from pathlib import Path
-from typing import Dict, List, Optional, Union
-import PyPDF2
+from typing import Dict, List, Optional, Tuple, Union
 from pptx import Presentation
 from dataclasses import dataclass
+from src.pdf_backends import PdfBackendFactory
+import xml.etree.ElementTree as ET
 import logging
+import posixpath
+import re
+import zipfile
+
+# OOXML namespaces used by the streaming PPTX reader
+P_NS = '{http://schemas.openxmlformats.org/presentationml/2006/main}'
+A_NS = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+R_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
 
 @dataclass
 class SlideContent:
@@ -16,8 +26,16 @@ class SlideContent:
 class PresentationProcessor:
     """Processes presentation files (PDF and PPTX) to extract content and structure."""
     
-    def __init__(self):
+    def __init__(self, stream_pptx: bool = True, pdf_backend: Optional[str] = None):
+        """
+        Args:
+            stream_pptx: Read PPTX slides directly from the zip with an incremental XML parser,
+                falling back to python-pptx if that fails
+            pdf_backend: Name of the PDF backend to use; by default the best installed one is picked
+        """
         self.logger = logging.getLogger(__name__)
+        self.stream_pptx = stream_pptx
+        self.pdf_backend = pdf_backend
     
     def process_file(self, file_path: Union[str, Path]) -> List[SlideContent]:
         """
@@ -47,34 +65,152 @@ class PresentationProcessor:
     
     def _process_pdf(self, file_path: Path) -> List[SlideContent]:
         """Process a PDF presentation file."""
-        slides = []
+        pages = None
         
-        try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    text = page.extract_text()
-                    # Create slide content
-                    slide = SlideContent(
-                        slide_number=page_num + 1,
-                        text=text,
-                        images=[],  # PDF image extraction would require additional processing
-                        metadata={
-                            'page_count': len(pdf_reader.pages),
-                            'file_type': 'pdf'
-                        }
-                    )
-                    slides.append(slide)
-                    
-        except Exception as e:
-            self.logger.error(f"Error processing PDF file: {e}")
-            raise
-            
-        return slides
+        backends = PdfBackendFactory.select(self.pdf_backend)
+        for backend in backends:
+            try:
+                pages = backend.extract_pages(file_path)
+                break
+            except Exception as e:
+                if backend is backends[-1]:
+                    self.logger.error(f"Error processing PDF file with {type(backend).__name__}: {e}")
+                    raise
+                self.logger.warning(f"{type(backend).__name__} failed on PDF file, trying the next backend: {e}")
+        
+        return [
+            SlideContent(
+                slide_number=page_num + 1,
+                text=text,
+                images=[],  # PDF image extraction would require additional processing
+                metadata={
+                    'page_count': len(pages),
+                    'file_type': 'pdf'
+                }
+            )
+            for page_num, text in enumerate(pages)
+        ]
     
     def _process_pptx(self, file_path: Path) -> List[SlideContent]:
         """Process a PPTX presentation file."""
+        if self.stream_pptx:
+            try:
+                return self._process_pptx_streaming(file_path)
+            except Exception as e:
+                self.logger.warning(f"Streaming PPTX reader failed, falling back to python-pptx: {e}")
+        return self._process_pptx_object_model(file_path)
+
+    def _process_pptx_streaming(self, file_path: Path) -> List[SlideContent]:
+        """
+        Process a PPTX file by stream-parsing only the slide XML parts.
+        Media parts are never read, so memory use does not grow with embedded images and videos.
+        Paragraphs below the top outline level are indented by two spaces per level.
+        """
+        slides = []
+
+        with zipfile.ZipFile(file_path) as package:
+            slide_parts = self._pptx_slide_parts(package)
+            for slide_num, part_name in enumerate(slide_parts, 1):
+                with package.open(part_name) as part:
+                    text_content, images = self._parse_slide_xml(part)
+                slides.append(SlideContent(
+                    slide_number=slide_num,
+                    text='\n'.join(text_content),
+                    images=images,
+                    metadata={
+                        'slide_count': len(slide_parts),
+                        'file_type': 'pptx'
+                    }
+                ))
+
+        return slides
+
+    @staticmethod
+    def _pptx_slide_parts(package: zipfile.ZipFile) -> List[str]:
+        """Returns the slide part names in presentation order."""
+        names = set(package.namelist())
+        rels_name = 'ppt/_rels/presentation.xml.rels'
+        if 'ppt/presentation.xml' in names and rels_name in names:
+            with package.open(rels_name) as rels_part:
+                targets = {
+                    rel.get('Id'): rel.get('Target')
+                    for rel in ET.parse(rels_part).getroot().iter(f'{REL_NS}Relationship')
+                }
+            with package.open('ppt/presentation.xml') as presentation_part:
+                slide_ids = ET.parse(presentation_part).getroot().iter(f'{P_NS}sldId')
+                parts = []
+                for slide_id in slide_ids:
+                    target = targets[slide_id.get(f'{R_NS}id')]
+                    if target.startswith('/'):
+                        parts.append(target.lstrip('/'))
+                    else:
+                        parts.append(posixpath.normpath(posixpath.join('ppt', target)))
+                return parts
+
+        # No presentation part: order slideN.xml parts by their number
+        slide_pattern = re.compile(r'^ppt/slides/slide(\d+)\.xml$')
+        numbered = [(int(m.group(1)), name) for name in names if (m := slide_pattern.match(name))]
+        return [name for _, name in sorted(numbered)]
+
+    @staticmethod
+    def _parse_slide_xml(part) -> Tuple[List[str], List[Dict]]:
+        """
+        Incrementally parses a slide part and returns its shape texts and picture positions.
+        Like python-pptx's slide.shapes, only top-level shapes are considered.
+        """
+        text_content = []
+        images = []
+        stack = []
+        paragraphs = []
+        runs = []
+        level = 0
+
+        for event, elem in ET.iterparse(part, events=('start', 'end')):
+            if event == 'start':
+                stack.append(elem.tag)
+                if elem.tag == f'{A_NS}p':
+                    runs = []
+                    level = 0
+                elif elem.tag == f'{P_NS}sp' and stack[-2:-1] == [f'{P_NS}spTree']:
+                    paragraphs = []
+                continue
+
+            stack.pop()
+            top_level = stack[-1:] == [f'{P_NS}spTree']
+            if elem.tag == f'{A_NS}pPr':
+                level = int(elem.get('lvl', 0))
+            elif elem.tag == f'{A_NS}t':
+                runs.append(elem.text or '')
+            elif elem.tag == f'{A_NS}br':
+                runs.append('\v')
+            elif elem.tag == f'{A_NS}p' and f'{P_NS}txBody' in stack:
+                paragraphs.append('  ' * level + ''.join(runs))
+            elif elem.tag == f'{P_NS}sp' and top_level:
+                text_content.append('\n'.join(paragraphs))
+                elem.clear()
+            elif elem.tag == f'{P_NS}pic' and top_level and (_is_media(elem) or _is_placeholder(elem)):
+                # python-pptx reports these as media and placeholder shapes rather than pictures
+                elem.clear()
+            elif elem.tag == f'{P_NS}pic' and top_level:
+                offset = elem.find(f'{P_NS}spPr/{A_NS}xfrm/{A_NS}off')
+                extent = elem.find(f'{P_NS}spPr/{A_NS}xfrm/{A_NS}ext')
+                images.append({
+                    'type': 'image',
+                    'position': {
+                        'left': int(offset.get('x')) if offset is not None else None,
+                        'top': int(offset.get('y')) if offset is not None else None,
+                        'width': int(extent.get('cx')) if extent is not None else None,
+                        'height': int(extent.get('cy')) if extent is not None else None
+                    }
+                })
+                elem.clear()
+            elif top_level:
+                elem.clear()
+
+        return text_content, images
+
+    def _process_pptx_object_model(self, file_path: Path) -> List[SlideContent]:
+        """Process a PPTX presentation file through python-pptx's full object model."""
         slides = []
         
         try:
@@ -90,7 +226,7 @@ class PresentationProcessor:
                         text_content.append(shape.text)
                     
                     # Handle images
-                    if shape.shape_type == 13:  # MSO_SHAPE_TYPE.PICTURE
+                    if shape.shape_type == 13 and not _is_media(shape._element):  # MSO_SHAPE_TYPE.PICTURE
                         image_info = {
                             'type': 'image',
                             'position': {
@@ -119,3 +255,14 @@ class PresentationProcessor:
             raise
             
         return slides
+
+def _is_media(pic) -> bool:
+    """Whether a p:pic element is the poster frame of a video or audio clip rather than an image."""
+    nv_pr = pic.find(f'{P_NS}nvPicPr/{P_NS}nvPr')
+    return nv_pr is not None and (
+        nv_pr.find(f'{A_NS}videoFile') is not None or nv_pr.find(f'{A_NS}audioFile') is not None
+    )
+
+def _is_placeholder(pic) -> bool:
+    """Whether a p:pic element fills a layout placeholder, whose position is inherited from the layout."""
+    return pic.find(f'{P_NS}nvPicPr/{P_NS}nvPr/{P_NS}ph') is not None
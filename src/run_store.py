@@ -0,0 +1,151 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from dataclasses import asdict
+from datetime import datetime
+from src.presentation_processor import SlideContent
+from src.content_analyzer import AnalyzedContent
+from src.llm_processor import Concepts, Summary
+import json
+import logging
+import uuid
+
+# Pipeline stages in execution order. Each stage has a checkpoint file in the run directory.
+STAGES = ["slides", "analyzed", "concepts", "summary"]
+
+class RunStore:
+    """Persists pipeline checkpoints so a failed run can resume at its first incomplete stage."""
+
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, run_dir: Union[str, Path]):
+        self.run_dir = Path(run_dir)
+        self.run_id = self.run_dir.name
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def create(cls, runs_dir: Union[str, Path], options: Dict[str, Any]) -> "RunStore":
+        """
+        Creates a new run directory and writes its manifest.
+
+        Args:
+            runs_dir: Directory holding all runs
+            options: CLI options needed to replay the run (source path and export targets)
+
+        Returns:
+            RunStore for the new run
+        """
+        run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        store = cls(Path(runs_dir) / run_id)
+        store.run_dir.mkdir(parents=True, exist_ok=False)
+        store._write_json(cls.MANIFEST_FILE, {"options": options, "completed": [], "exported": []})
+        return store
+
+    @classmethod
+    def open(cls, runs_dir: Union[str, Path], run_id: str) -> "RunStore":
+        """
+        Opens an existing run.
+
+        Raises:
+            FileNotFoundError: If the run does not exist
+        """
+        store = cls(Path(runs_dir) / run_id)
+        if not (store.run_dir / cls.MANIFEST_FILE).exists():
+            raise FileNotFoundError(f"Run not found: {store.run_dir}")
+        return store
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        return self._read_json(self.MANIFEST_FILE)
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        return self.manifest["options"]
+
+    def update_options(self, **options: Any) -> None:
+        """Overrides stored options, ignoring None values."""
+        manifest = self.manifest
+        manifest["options"].update({k: v for k, v in options.items() if v is not None})
+        self._write_json(self.MANIFEST_FILE, manifest)
+
+    def has(self, stage: str) -> bool:
+        return stage in self.manifest["completed"]
+
+    def first_incomplete_stage(self) -> Optional[str]:
+        """
+        Returns the stage the pipeline resumes at, "export" if only exports are left, or None if done.
+        A checkpoint makes every earlier stage unnecessary, so this is the stage after the last completed one,
+        e.g. a run created from an existing summary goes straight to export.
+        """
+        completed = self.manifest["completed"]
+        done = [index for index, stage in enumerate(STAGES) if stage in completed]
+        next_index = done[-1] + 1 if done else 0
+        if next_index < len(STAGES):
+            return STAGES[next_index]
+        return "export" if self.pending_targets() else None
+
+    def pending_targets(self) -> List[Dict[str, Any]]:
+        """Returns the export targets that have not been exported successfully yet."""
+        manifest = self.manifest
+        return [target for target in manifest["options"].get("targets", []) if target not in manifest["exported"]]
+
+    def mark_exported(self, target: Dict[str, Any]) -> None:
+        manifest = self.manifest
+        if target not in manifest["exported"]:
+            manifest["exported"].append(target)
+        self._write_json(self.MANIFEST_FILE, manifest)
+
+    def save_slides(self, slides: List[SlideContent]) -> None:
+        self._save_stage("slides", [asdict(slide) for slide in slides])
+
+    def load_slides(self) -> List[SlideContent]:
+        return [SlideContent(**slide) for slide in self._load_stage("slides")]
+
+    def save_analyzed(self, analyzed_slides: List[AnalyzedContent]) -> None:
+        self._save_stage("analyzed", [asdict(slide) for slide in analyzed_slides])
+
+    def load_analyzed(self) -> List[AnalyzedContent]:
+        return [AnalyzedContent(**slide) for slide in self._load_stage("analyzed")]
+
+    def save_concepts(self, concepts: Concepts) -> None:
+        self._save_stage("concepts", concepts.model_dump())
+
+    def load_concepts(self) -> Concepts:
+        return Concepts.model_validate(self._load_stage("concepts"))
+
+    def save_summary(self, summary: Summary) -> None:
+        self._save_stage("summary", summary.model_dump())
+
+    def load_summary(self) -> Summary:
+        return Summary.model_validate(self._load_stage("summary"))
+
+    def _save_stage(self, stage: str, data: Any) -> None:
+        # The checkpoint is written before the manifest so a crash never marks a missing file as complete
+        self._write_json(f"{stage}.json", data)
+        manifest = self.manifest
+        if stage not in manifest["completed"]:
+            manifest["completed"].append(stage)
+        self._write_json(self.MANIFEST_FILE, manifest)
+        self.logger.info(f"Saved {stage} checkpoint for run {self.run_id}")
+
+    def _load_stage(self, stage: str) -> Any:
+        if not self.has(stage):
+            raise ValueError(f"Run {self.run_id} has no '{stage}' checkpoint")
+        return self._read_json(f"{stage}.json")
+
+    def _write_json(self, name: str, data: Any) -> None:
+        # Write to a temp file and rename so an interrupted write never leaves a truncated checkpoint
+        path = self.run_dir / name
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        tmp_path.replace(path)
+
+    def _read_json(self, name: str) -> Any:
+        with open(self.run_dir / name, "r") as f:
+            return json.load(f)
+
+
+def load_summary_file(path: Union[str, Path]) -> Summary:
+    """Loads a Summary from a JSON file such as a run's summary.json checkpoint."""
+    with open(path, "r") as f:
+        return Summary.model_validate(json.load(f))
@@ -0,0 +1,305 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from enum import Enum
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.presentation_processor import PresentationProcessor
+from src.content_analyzer import ContentAnalyzer
+from src.llm_processor import LLMProcessor
+from src.exporter import ExporterType
+from src.notion_sync import default_state_path
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+@dataclass
+class Job:
+    """A single summarization request handled by the service."""
+    job_id: str
+    source_path: str
+    exporter: str
+    export_path: Optional[str]
+    status: JobStatus = JobStatus.QUEUED
+    error: Optional[str] = None
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "source_path": self.source_path,
+            "exporter": self.exporter,
+            "export_path": self.export_path,
+            "status": self.status.value,
+            "error": self.error,
+            "stage_seconds": self.stage_seconds,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+class SummaryService:
+    """
+    Keeps the pipeline components warm and runs summarization jobs on a bounded worker pool.
+
+    The processors, the LLM processor and the exporters are created once and shared by all
+    jobs, so a job only pays for its own parsing, LLM calls and export.
+    """
+
+    def __init__(
+        self,
+        presentation_processor: PresentationProcessor,
+        content_analyzer: ContentAnalyzer,
+        llm_processor: LLMProcessor,
+        exporter_factory: Callable[[str, Optional[str]], Any],
+        workers: int = 2,
+        max_queue: int = 16,
+        max_history: int = 1000,
+    ):
+        """
+        Args:
+            presentation_processor: Shared presentation parser
+            content_analyzer: Shared content analyzer
+            llm_processor: Shared LLM processor
+            exporter_factory: Creates an exporter from an exporter type value and export path
+            workers: Number of jobs processed concurrently
+            max_queue: Maximum number of queued jobs before submissions are rejected
+            max_history: Number of finished jobs kept for status queries; older ones are evicted
+        """
+        self.presentation_processor = presentation_processor
+        self.content_analyzer = content_analyzer
+        self.llm_processor = llm_processor
+        self.exporter_factory = exporter_factory
+        self.workers = workers
+        self.max_history = max_history
+        self.logger = logging.getLogger(__name__)
+
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(maxsize=max_queue)
+        self._jobs: Dict[str, Job] = {}
+        self._exporters: Dict[Tuple[str, Optional[str]], Any] = {}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._started_at: Optional[float] = None
+        # Finished job counts since start, kept apart from the job history so eviction does not reset them
+        self._finished_counts = {JobStatus.SUCCEEDED: 0, JobStatus.FAILED: 0}
+
+    def start(self) -> None:
+        """Starts the worker threads."""
+        self._started_at = time.time()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"summary-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Lets queued jobs finish, then stops the worker threads."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, source_path: str, exporter: str, export_path: Optional[str] = None) -> Job:
+        """
+        Queues a new job.
+
+        Raises:
+            ValueError: If the exporter type is not supported
+            QueueFullError: If the queue is at capacity
+        """
+        try:
+            ExporterType(exporter)
+        except ValueError:
+            raise ValueError(
+                f"Exporter type '{exporter}' not supported. Available types: {[t.value for t in ExporterType]}"
+            )
+        if exporter == ExporterType.NOTION_API.value and export_path is None:
+            # Exporters are shared between jobs, so the per-deck state file is resolved here
+            export_path = str(default_state_path(source_path))
+        job = Job(job_id=uuid.uuid4().hex, source_path=source_path, exporter=exporter, export_path=export_path)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.job_id]
+            raise QueueFullError(f"Job queue is full ({self._queue.maxsize} jobs)")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns job counts, queue depth, throughput and average stage durations."""
+        jobs = self.list_jobs()
+        counts = {status.value: 0 for status in JobStatus}
+        for job in jobs:
+            if job.status not in self._finished_counts:
+                counts[job.status.value] += 1
+        with self._lock:
+            counts.update({status.value: count for status, count in self._finished_counts.items()})
+
+        finished = [job for job in jobs if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)]
+        stage_totals: Dict[str, List[float]] = {}
+        for job in finished:
+            for stage, seconds in job.stage_seconds.items():
+                stage_totals.setdefault(stage, []).append(seconds)
+
+        uptime = time.time() - self._started_at if self._started_at else 0.0
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "jobs": counts,
+            "uptime_seconds": uptime,
+            "jobs_per_minute": counts[JobStatus.SUCCEEDED.value] / (uptime / 60) if uptime else 0.0,
+            "avg_job_seconds": (
+                sum(job.finished_at - job.started_at for job in finished) / len(finished) if finished else 0.0
+            ),
+            "avg_stage_seconds": {stage: sum(values) / len(values) for stage, values in stage_totals.items()},
+        }
+
+    def _get_exporter(self, exporter: str, export_path: Optional[str]) -> Any:
+        key = (exporter, export_path)
+        with self._lock:
+            if key not in self._exporters:
+                self._exporters[key] = self.exporter_factory(exporter, export_path)
+            return self._exporters[key]
+
+    def _worker(self) -> None:
+        # Each worker owns an event loop for the async exporters, reused across its jobs
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    break
+                self._run_job(job, loop)
+        finally:
+            # Exporters keep per-loop resources warm between jobs, such as the Notion MCP session
+            with self._lock:
+                exporters = list(self._exporters.values())
+            for exporter in exporters:
+                try:
+                    loop.run_until_complete(exporter.aclose())
+                except Exception as e:
+                    self.logger.error(f"Closing exporter failed: {e}")
+            loop.close()
+
+    def _run_job(self, job: Job, loop: asyncio.AbstractEventLoop) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        try:
+            slides = self._timed(job, "parse", self.presentation_processor.process_file, job.source_path)
+            analyzed_slides = self._timed(job, "analyze", self.content_analyzer.analyze_presentation, slides)
+            concepts = self._timed(job, "concepts", self.llm_processor.extract_concepts, analyzed_slides)
+            summary = self._timed(job, "summary", self.llm_processor.summarize, concepts)
+            exporter = self._get_exporter(job.exporter, job.export_path)
+            self._timed(job, "export", lambda: loop.run_until_complete(exporter.export(summary)))
+            job.status = JobStatus.SUCCEEDED
+        except Exception as e:
+            self.logger.error(f"Job {job.job_id} failed: {e}")
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+        finally:
+            job.finished_at = time.time()
+            self._record_finished(job)
+
+    def _record_finished(self, job: Job) -> None:
+        """Counts a finished job and evicts the oldest finished jobs beyond max_history."""
+        with self._lock:
+            self._finished_counts[job.status] += 1
+            finished = [job_id for job_id, job in self._jobs.items() if job.status in self._finished_counts]
+            for job_id in finished[:max(len(finished) - self.max_history, 0)]:
+                del self._jobs[job_id]
+
+    @staticmethod
+    def _timed(job: Job, stage: str, func: Callable, *args: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            job.stage_seconds[stage] = time.perf_counter() - start
+
+
+class SummaryRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API for a SummaryService:
+        POST /jobs          {"source_path": ..., "exporter": ..., "export_path": ...}
+        GET  /jobs          list all jobs
+        GET  /jobs/<id>     job status
+        GET  /metrics       throughput and queue metrics
+    """
+    service: SummaryService
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send_json(200, self.service.metrics())
+        elif self.path == "/jobs":
+            self._send_json(200, [job.to_dict() for job in self.service.list_jobs()])
+        elif self.path.startswith("/jobs/"):
+            job = self.service.get_job(self.path[len("/jobs/"):])
+            if job is None:
+                self._send_json(404, {"error": "Job not found"})
+            else:
+                self._send_json(200, job.to_dict())
+        else:
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            source_path = body["source_path"]
+        except (ValueError, KeyError):
+            self._send_json(400, {"error": "Body must be JSON with a 'source_path' field"})
+            return
+        try:
+            job = self.service.submit(source_path, body.get("exporter", "markdown"), body.get("export_path"))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except QueueFullError as e:
+            self._send_json(503, {"error": str(e)})
+            return
+        self._send_json(202, job.to_dict())
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+    def _send_json(self, status: int, data: Any) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_server(service: SummaryService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Creates an HTTP server bound to the local host that serves the given service."""
+    handler = type("BoundSummaryRequestHandler", (SummaryRequestHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
@@ -1,6 +1,8 @@
 import pytest
 from pathlib import Path
 import tempfile
+import struct
+import zlib
 from PyPDF2 import PdfWriter
 from pptx import Presentation
 from pptx.util import Inches
@@ -69,6 +71,47 @@ def sample_pptx(temp_dir):
     prs.save(pptx_path)
     return pptx_path
 
+@pytest.fixture
+def rich_pptx(temp_dir):
+    """A deck with outline levels, a line break, a picture, a movie, a picture placeholder, a group shape and reordered slides."""
+    # Minimal 1x1 PNG
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    png = b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)) \
+        + chunk(b"IDAT", zlib.compress(b"\x00\x00\x00\x00")) + chunk(b"IEND", b"")
+    image_path = temp_dir / "pixel.png"
+    image_path.write_bytes(png)
+
+    prs = Presentation()
+    slide1 = prs.slides.add_slide(prs.slide_layouts[1])
+    slide1.shapes.title.text = "Outline"
+    body = slide1.placeholders[1].text_frame
+    body.text = "Top point"
+    sub = body.add_paragraph()
+    sub.text = "Sub point"
+    sub.level = 1
+    slide1.shapes.add_picture(str(image_path), Inches(1), Inches(2), Inches(3), Inches(4))
+    movie_path = temp_dir / "clip.mp4"
+    movie_path.write_bytes(b"\x00\x00\x00\x18ftypmp42")
+    slide1.shapes.add_movie(str(movie_path), Inches(5), Inches(2), Inches(3), Inches(2), mime_type="video/mp4")
+    group = slide1.shapes.add_group_shape()
+    group.shapes.add_textbox(Inches(1), Inches(1), Inches(1), Inches(1)).text = "Grouped text"
+
+    slide2 = prs.slides.add_slide(prs.slide_layouts[8])
+    slide2.shapes.title.text = "Line\vbreak"
+    # A filled picture placeholder inherits its position from the layout
+    slide2.placeholders[1].insert_picture(str(image_path))
+    caption = slide2.placeholders[2]._element
+    caption.getparent().remove(caption)
+
+    # Move the second slide to the front
+    slide_ids = prs.slides._sldIdLst
+    slide_ids.insert(0, slide_ids[1])
+
+    pptx_path = temp_dir / "rich.pptx"
+    prs.save(pptx_path)
+    return pptx_path
+
 @pytest.fixture
 def content_analyzer():
     return ContentAnalyzer()
@@ -0,0 +1,77 @@
+import pytest
+import argparse
+import asyncio
+from src.exporter import Exporter, JsonExporter, ExporterFactory, ExporterType, export_all
+from src.llm_processor import Summary, TopicSummary
+from src.run_store import load_summary_file
+from cli.main import main, parse_target
+
+
+class RecordingExporter(Exporter):
+    def __init__(self, error=None):
+        super().__init__(llm=None)
+        self.error = error
+        self.exported = []
+
+    async def export(self, summary):
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        self.exported.append(summary)
+
+@pytest.fixture
+def sample_summary():
+    return Summary(topics=[
+        TopicSummary(topic="Entropy", examples=["Fair coin: $H = 1$ bit"], key_terms=None,
+                     detailed_explanation="Entropy measures uncertainty.",
+                     summary="Uncertainty of a random variable.", key_insights=["Maximal when uniform"])
+    ])
+
+def test_export_all_reports_each_target(sample_summary):
+    """Test that a failing exporter does not stop the others and is reported by name."""
+    ok = RecordingExporter()
+    error = RuntimeError("Notion is down")
+    errors = asyncio.run(export_all({"markdown": ok, "notion": RecordingExporter(error)}, sample_summary))
+
+    assert errors == {"markdown": None, "notion": error}
+    assert ok.exported == [sample_summary]
+
+def test_json_exporter_round_trip(temp_dir, sample_summary):
+    """Test that the JSON export can be loaded back for --from-summary."""
+    export_path = temp_dir / "summary.json"
+    exporter = ExporterFactory.get_exporter(ExporterType.JSON, llm=None, export_path=str(export_path))
+    asyncio.run(exporter.export(sample_summary))
+
+    assert isinstance(exporter, JsonExporter)
+    assert load_summary_file(export_path) == sample_summary
+
+def test_notion_api_state_follows_source_deck(temp_dir):
+    """Test that the notion_api state file is keyed on the source deck, and required without one."""
+    exporter = ExporterFactory.get_exporter(ExporterType.NOTION_API, llm=None, export_path=None,
+                                            source_path=str(temp_dir / "lecture.pptx"))
+    assert exporter.export_path == temp_dir / "lecture.notion.json"
+
+    with pytest.raises(ValueError, match="needs an export path"):
+        ExporterFactory.get_exporter(ExporterType.NOTION_API, llm=None, export_path=None, source_path=None)
+
+def test_parse_target_with_path():
+    """Test parsing TYPE=PATH and a bare TYPE."""
+    assert parse_target("markdown=notes/lecture.md") == {"exporter": "markdown", "export_path": "notes/lecture.md"}
+    assert parse_target("json") == {"exporter": "json", "export_path": None}
+
+def test_parse_target_unknown_type():
+    """Test that an unknown exporter type is rejected."""
+    with pytest.raises(argparse.ArgumentTypeError, match="invalid exporter 'pdf'"):
+        parse_target("pdf=out.pdf")
+
+@pytest.mark.parametrize("exporters, message", [
+    (["markdown=a.md"], "given twice"),
+    (["markdown=a.md", "json"], "ambiguous with several exporters"),
+])
+def test_export_path_conflicts(exporters, message, monkeypatch, capsys):
+    """Test that --export_path combined with --exporter paths reports the actual conflict."""
+    monkeypatch.setattr("sys.argv", ["main.py", "--source_path", "deck.pptx", "--export_path", "b.md",
+                                     "--exporter", *exporters])
+    with pytest.raises(SystemExit):
+        main()
+    assert message in capsys.readouterr().err
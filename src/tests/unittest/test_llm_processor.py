@@ -0,0 +1,252 @@
+import pytest
+import httpx
+import json
+from langchain_core.runnables import RunnableLambda
+from langchain_openai import ChatOpenAI
+from src import llm_processor
+from src.content_analyzer import AnalyzedContent
+from src.llm_processor import LLMProcessor, Concept, Concepts, Summary, TopicSummary
+from src.token_budget import TokenBudgeter
+
+
+class StubOpenAI:
+    """
+    A real ChatOpenAI whose HTTP transport replays tool call arguments, valid or not.
+    Arguments that are not complete JSON are answered with finish_reason "length", like a cut-off response.
+    """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+        self.max_tokens_seen = []
+        self.llm = ChatOpenAI(model="gpt-4.1-mini", api_key="test-key",
+                              http_client=httpx.Client(transport=httpx.MockTransport(self._respond)))
+
+    def _respond(self, request):
+        body = json.loads(request.content)
+        self.prompts.append("\n".join(message["content"] for message in body["messages"]))
+        self.max_tokens_seen.append(body.get("max_completion_tokens"))
+        arguments = self.responses.pop(0)
+        try:
+            json.loads(arguments)
+            finish_reason = "tool_calls"
+        except json.JSONDecodeError:
+            finish_reason = "length"
+        return httpx.Response(200, json={
+            "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4.1-mini",
+            "choices": [{"index": 0, "finish_reason": finish_reason, "message": {
+                "role": "assistant", "content": None,
+                "tool_calls": [{"id": "call-1", "type": "function", "function": {
+                    "name": body["tool_choice"]["function"]["name"], "arguments": arguments}}],
+            }}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 120, "total_tokens": 220},
+        })
+
+
+def topic(name, **overrides):
+    data = {"topic": name, "examples": None, "key_terms": None, "detailed_explanation": f"About {name}.",
+            "summary": f"{name} in short.", "key_insights": [f"{name} matters"]}
+    data.update(overrides)
+    return {key: value for key, value in data.items() if value is not ...}
+
+@pytest.fixture
+def concepts():
+    return Concepts(concepts=[Concept(topic=name, key_ideas=[name.lower()]) for name in ["Entropy", "Bayes", "Markov"]])
+
+@pytest.fixture
+def analyzed_slides():
+    return [AnalyzedContent(slide_number=i, main_text=f"Slide {i}", topic=f"Slide {i}", metadata={}) for i in (1, 2, 3)]
+
+def test_valid_summary_needs_one_call(concepts):
+    """Test that a valid output is returned without repair."""
+    model = StubOpenAI([json.dumps({"topics": [topic("Entropy"), topic("Bayes"), topic("Markov")]})])
+    summary = LLMProcessor(model.llm).summarize(concepts)
+
+    assert [t.topic for t in summary.topics] == ["Entropy", "Bayes", "Markov"]
+    assert len(model.prompts) == 1
+
+def test_invalid_topic_is_rerequested_alone(concepts):
+    """Test that only the topic missing its summary field is requested again."""
+    model = StubOpenAI([
+        json.dumps({"topics": [topic("Entropy"), topic("Bayes", summary=...), topic("Markov")]}),
+        json.dumps({"topics": [topic("Bayes")]}),
+    ])
+    summary = LLMProcessor(model.llm).summarize(concepts)
+
+    assert [t.topic for t in summary.topics] == ["Entropy", "Bayes", "Markov"]
+    assert summary.topics[1].summary == "Bayes in short."
+    assert len(model.prompts) == 2
+    assert "bayes" in model.prompts[1] and "entropy" not in model.prompts[1] and "markov" not in model.prompts[1]
+
+def test_truncated_summary_requests_missing_topics(concepts):
+    """Test that a cut-off topic list only re-requests the topics that did not make it."""
+    truncated = json.dumps({"topics": [topic("Entropy"), topic("Bayes")]})[:-40]
+    model = StubOpenAI([truncated, json.dumps({"topics": [topic("Bayes"), topic("Markov")]})])
+    summary = LLMProcessor(model.llm).summarize(concepts)
+
+    assert [t.topic for t in summary.topics] == ["Entropy", "Bayes", "Markov"]
+    assert "entropy" not in model.prompts[1]
+
+def test_truncated_last_topic_is_not_trusted(concepts):
+    """Test that a topic cut off mid-value is requested again even though it parses."""
+    full = json.dumps({"topics": [topic("Entropy"), topic("Bayes", key_insights=[], summary="Bayes in short.")]})
+    truncated = full[:full.rindex("short")]
+    model = StubOpenAI([truncated, json.dumps({"topics": [topic("Bayes"), topic("Markov")]})])
+    summary = LLMProcessor(model.llm).summarize(concepts)
+
+    assert summary.topics[1].summary == "Bayes in short."
+
+def test_summary_repair_gives_up(concepts):
+    """Test that repair stops after the configured number of rounds."""
+    broken = json.dumps({"topics": [topic("Entropy", summary=...)]})
+    model = StubOpenAI([broken, broken])
+
+    with pytest.raises(ValueError, match="Could not repair"):
+        LLMProcessor(model.llm, max_repair_rounds=1).summarize(concepts)
+    assert len(model.prompts) == 2
+
+def test_tool_call_payload_is_salvaged(concepts):
+    """Test salvaging the valid topics of tool call arguments that fail validation."""
+    model = StubOpenAI([
+        json.dumps({"topics": [topic("Entropy"), topic("Bayes"), topic("Markov", key_insights=...)]}),
+        json.dumps({"topics": [topic("Markov")]}),
+    ])
+    summary = LLMProcessor(model.llm).summarize(concepts)
+
+    assert [t.topic for t in summary.topics] == ["Entropy", "Bayes", "Markov"]
+
+def test_concepts_repair_and_continuation(analyzed_slides):
+    """Test that broken concepts are completed and a truncated list is continued."""
+    first = json.dumps({"concepts": [
+        {"topic": "Entropy", "key_ideas": ["uncertainty"]},
+        {"topic": "Bayes"},
+        {"topic": "Markov", "key_ideas": ["memoryless"]},
+        {"topic": "Gauss", "key_ideas": ["bell curve"]},
+    ]})[:-30]
+    model = StubOpenAI([
+        first,
+        json.dumps({"concepts": [
+            {"topic": "Bayes", "key_ideas": ["posterior"]},
+            {"topic": "Gauss", "key_ideas": ["bell curve"]},
+        ]}),
+    ])
+    concepts = LLMProcessor(model.llm).extract_concepts(analyzed_slides)
+
+    assert [c.topic for c in concepts.concepts] == ["Entropy", "Bayes", "Markov", "Gauss"]
+    assert concepts.concepts[1].key_ideas == ["posterior"]
+    assert '"topic": "Bayes"' in model.prompts[1] and "cut off" in model.prompts[1]
+
+@pytest.mark.parametrize("payload", [{}, {"items": [{"topic": "Entropy", "key_ideas": []}]}, {"concepts": None}])
+def test_concepts_without_list_are_requested_again(analyzed_slides, payload):
+    """Test that an output without a concepts list is requested again instead of yielding no concepts."""
+    model = StubOpenAI([json.dumps(payload), json.dumps({"concepts": [{"topic": "Entropy", "key_ideas": ["h"]}]})])
+    concepts = LLMProcessor(model.llm).extract_concepts(analyzed_slides)
+
+    assert [c.topic for c in concepts.concepts] == ["Entropy"]
+    assert len(model.prompts) == 2
+
+def test_concepts_without_list_give_up(analyzed_slides):
+    """Test that an output that never has a concepts list raises."""
+    model = StubOpenAI([json.dumps({}), json.dumps({})])
+
+    with pytest.raises(ValueError):
+        LLMProcessor(model.llm, max_repair_rounds=1).extract_concepts(analyzed_slides)
+    assert len(model.prompts) == 2
+
+def test_summary_without_list_requests_all_topics(concepts):
+    """Test that an output with a null topics list re-requests every topic."""
+    model = StubOpenAI([
+        json.dumps({"topics": None}),
+        json.dumps({"topics": [topic("Entropy"), topic("Bayes"), topic("Markov")]}),
+    ])
+    summary = LLMProcessor(model.llm).summarize(concepts)
+
+    assert [t.topic for t in summary.topics] == ["Entropy", "Bayes", "Markov"]
+
+def test_process_presentation_chain(analyzed_slides):
+    """Test the composed chain with a repair in each stage."""
+    model = StubOpenAI([
+        json.dumps({"concepts": [{"topic": "Entropy", "key_ideas": ["uncertainty"]}, {"topic": "Bayes"}]}),
+        json.dumps({"concepts": [{"topic": "Bayes", "key_ideas": ["posterior"]}]}),
+        json.dumps({"topics": [topic("Entropy", summary=...), topic("Bayes")]}),
+        json.dumps({"topics": [topic("Entropy")]}),
+    ])
+    summary = LLMProcessor(model.llm).process_presentation().invoke(analyzed_slides)
+
+    assert [t.topic for t in summary.topics] == ["Entropy", "Bayes"]
+    assert len(model.prompts) == 4
+
+def test_budgeted_summary_uses_per_topic_limits(concepts, analyzed_slides):
+    """Test that each topic is generated with its own max_tokens and length guidance."""
+    model = StubOpenAI([json.dumps(topic(name)) for name in ["Entropy", "Bayes", "Markov"]])
+    processor = LLMProcessor(model.llm, budgeter=TokenBudgeter(deck_budget=1500, min_tokens=300), max_concurrency=1)
+
+    summary, report = processor.summarize_with_budget(concepts, analyzed_slides)
+
+    assert [t.topic for t in summary.topics] == ["Entropy", "Bayes", "Markov"]
+    assert model.max_tokens_seen == [budget.max_tokens for budget in report.topics]
+    assert all("Keep detailed_explanation to about" in prompt for prompt in model.prompts)
+    assert report.used_tokens == 360
+
+def test_budgeted_topic_retries_with_more_room(concepts, analyzed_slides):
+    """Test that a topic cut off at its budget is retried alone with a larger limit."""
+    model = StubOpenAI([
+        json.dumps(topic("Entropy")),
+        json.dumps(topic("Bayes"))[:50],
+        json.dumps(topic("Bayes")),
+        json.dumps(topic("Markov")),
+    ])
+    processor = LLMProcessor(model.llm, budgeter=TokenBudgeter(deck_budget=900, min_tokens=300), max_concurrency=1)
+
+    summary, report = processor.summarize_with_budget(concepts, analyzed_slides)
+
+    assert [t.topic for t in summary.topics] == ["Entropy", "Bayes", "Markov"]
+    assert model.max_tokens_seen[2] == int(report.topics[1].max_tokens * 1.5)
+
+def test_budgeted_topic_last_attempt_is_uncapped(concepts, analyzed_slides):
+    """Test that a topic overflowing every capped attempt gets a last attempt without a token limit."""
+    bayes = json.dumps(topic("Bayes"))
+    model = StubOpenAI([json.dumps(topic("Entropy")), bayes[:50], bayes[:80], bayes, json.dumps(topic("Markov"))])
+    processor = LLMProcessor(model.llm, budgeter=TokenBudgeter(deck_budget=900, min_tokens=300), max_concurrency=1)
+
+    summary, report = processor.summarize_with_budget(concepts, analyzed_slides)
+
+    assert [t.topic for t in summary.topics] == ["Entropy", "Bayes", "Markov"]
+    assert model.max_tokens_seen[1:4] == [report.topics[1].max_tokens, int(report.topics[1].max_tokens * 1.5), None]
+
+def test_budgeted_topic_invalid_output_is_retried(concepts, analyzed_slides):
+    """Test that a topic failing validation is requested again without growing its limit."""
+    model = StubOpenAI([
+        json.dumps(topic("Entropy")),
+        json.dumps(topic("Bayes", summary=...)),
+        json.dumps(topic("Bayes")),
+        json.dumps(topic("Markov")),
+    ])
+    processor = LLMProcessor(model.llm, budgeter=TokenBudgeter(deck_budget=900, min_tokens=300), max_concurrency=1)
+
+    summary, report = processor.summarize_with_budget(concepts, analyzed_slides)
+
+    assert summary.topics[1].summary == "Bayes in short."
+    assert model.max_tokens_seen[2] == report.topics[1].max_tokens
+
+def test_budgeted_topic_validation_error_is_retried(concepts, analyzed_slides, monkeypatch):
+    """Test that a ValidationError raised by the model call is retried like an invalid output."""
+    calls = []
+
+    def structured(llm, schema):
+        def respond(prompt_value):
+            calls.append(prompt_value.to_string())
+            if len(calls) == 1:
+                # Raises a ValidationError, like json_schema parsing of an invalid response
+                schema.model_validate({"topic": "Entropy"})
+            name = next(concept.topic for concept in concepts.concepts if concept.topic in calls[-1])
+            return {"raw": None, "parsed": TopicSummary(**topic(name)), "parsing_error": None}
+        return RunnableLambda(respond)
+
+    monkeypatch.setattr(llm_processor, "_structured", structured)
+    processor = LLMProcessor(StubOpenAI([]).llm, budgeter=TokenBudgeter(deck_budget=900, min_tokens=300),
+                             max_concurrency=1)
+    summary, _ = processor.summarize_with_budget(concepts, analyzed_slides)
+
+    assert [t.topic for t in summary.topics] == ["Entropy", "Bayes", "Markov"]
+    assert len(calls) == 4
@@ -0,0 +1,226 @@
+import pytest
+import json
+import threading
+import urllib.error
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.notion_sync import NotionClient, NotionSync, NotionSyncState, default_state_path, summary_to_blocks, _rich_text
+from src.llm_processor import Summary, TopicSummary
+
+
+class FakeNotionHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the Notion API keeping pages and their ordered children in memory."""
+    pages: dict
+    blocks: dict
+    # Status codes to answer the next requests with instead of handling them
+    failures: list
+
+    def do_POST(self):
+        body = self._read_body()
+        if self._fail():
+            return
+        page_id = uuid.uuid4().hex
+        self.pages[page_id] = {"title": body["properties"]["title"]["title"][0]["text"]["content"], "children": []}
+        self._send({"id": page_id})
+
+    def do_PATCH(self):
+        body = self._read_body()
+        if self._fail():
+            return
+        parts = self.path.strip("/").split("/")
+        if parts[0] == "pages":
+            self.pages[parts[1]]["title"] = body["properties"]["title"]["title"][0]["text"]["content"]
+            self._send({"id": parts[1]})
+        elif parts[-1] == "children":
+            children = self.pages[parts[1]]["children"]
+            position = children.index(body["after"]) + 1 if "after" in body else len(children)
+            new_ids = []
+            for block in body["children"]:
+                block_id = uuid.uuid4().hex
+                self.blocks[block_id] = block
+                new_ids.append(block_id)
+            children[position:position] = new_ids
+            self._send({"results": [{"id": block_id} for block_id in new_ids]})
+        else:
+            block = self.blocks[parts[1]]
+            block[block["type"]] = body[block["type"]]
+            self._send({"id": parts[1]})
+
+    def do_DELETE(self):
+        if self._fail():
+            return
+        block_id = self.path.strip("/").split("/")[1]
+        for page in self.pages.values():
+            if block_id in page["children"]:
+                page["children"].remove(block_id)
+        self._send({"id": block_id, "archived": True})
+
+    def log_message(self, format, *args):
+        pass
+
+    def _fail(self):
+        if not self.failures:
+            return False
+        status = self.failures.pop(0)
+        if status is None:
+            return False
+        self.send_response(status)
+        self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return True
+
+    def _read_body(self):
+        return json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+    def _send(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def fake_notion():
+    handler = type("Handler", (FakeNotionHandler,), {"pages": {}, "blocks": {}, "failures": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def client(fake_notion):
+    return NotionClient(token="test-token", base_url=f"http://127.0.0.1:{fake_notion.server_address[1]}")
+
+def make_topic(topic, insights):
+    return TopicSummary(topic=topic, examples=None, key_terms=None, detailed_explanation=f"All about {topic}.",
+                        summary=f"{topic} in short.", key_insights=insights)
+
+def page_texts(fake_notion, page_id):
+    handler = fake_notion.RequestHandlerClass
+    texts = []
+    for block_id in handler.pages[page_id]["children"]:
+        block = handler.blocks[block_id]
+        rich_text = block[block["type"]].get("rich_text", [])
+        texts.append("".join(part["text"]["content"] for part in rich_text if part["type"] == "text"))
+    return texts
+
+def page_texts_for(summary):
+    texts = []
+    for rendered in summary_to_blocks(summary):
+        rich_text = rendered.block[rendered.block_type].get("rich_text", [])
+        texts.append("".join(part["text"]["content"] for part in rich_text if part["type"] == "text"))
+    return texts
+
+def sync_twice(client, temp_dir, before, after):
+    sync = NotionSync(client, temp_dir / "sync.json")
+    sync.sync(before, "parent")
+    requests_before = client.request_count
+    state = sync.sync(after, "parent")
+    return state, client.request_count - requests_before
+
+
+def test_first_export_creates_page(client, fake_notion, temp_dir):
+    """Test that the first export creates the page and records every block."""
+    summary = Summary(topics=[make_topic("Entropy", ["a", "b"])])
+    state = NotionSync(client, temp_dir / "sync.json").sync(summary, "parent")
+
+    assert fake_notion.RequestHandlerClass.pages[state.page_id]["title"] == "Entropy"
+    assert state.block_ids == fake_notion.RequestHandlerClass.pages[state.page_id]["children"]
+    assert len(state.blocks) == len(summary_to_blocks(summary))
+    assert NotionSyncState.load(temp_dir / "sync.json") == state
+
+def test_unchanged_reexport_sends_no_block_requests(client, temp_dir):
+    """Test that re-exporting an identical summary does not touch any block."""
+    summary = Summary(topics=[make_topic("Entropy", ["a", "b"])])
+    _, requests = sync_twice(client, temp_dir, summary, summary)
+
+    assert requests == 0
+
+def test_changed_insight_is_updated_in_place(client, fake_notion, temp_dir):
+    """Test that editing one bullet sends a single update."""
+    before = Summary(topics=[make_topic(f"Topic {i}", ["a", "b", "c"]) for i in range(20)])
+    after = before.model_copy(deep=True)
+    after.topics[7].key_insights[1] = "changed"
+
+    state, requests = sync_twice(client, temp_dir, before, after)
+
+    assert requests == 1
+    assert page_texts(fake_notion, state.page_id) == page_texts_for(after)
+
+def test_inserted_and_removed_topics(client, fake_notion, temp_dir):
+    """Test that inserting and removing topics keeps the page in order."""
+    before = Summary(topics=[make_topic(f"Topic {i}", ["a"]) for i in range(5)])
+    after = Summary(topics=[make_topic("Intro", ["x"])] + before.topics[:2] + before.topics[3:]
+                    + [make_topic("Outro", ["y", "z"])])
+
+    state, requests = sync_twice(client, temp_dir, before, after)
+
+    assert page_texts(fake_notion, state.page_id) == page_texts_for(after)
+    assert state.block_ids == fake_notion.RequestHandlerClass.pages[state.page_id]["children"]
+    assert requests < len(summary_to_blocks(after))
+
+def test_rich_text_math_and_long_text():
+    """Test inline math conversion and splitting of long text."""
+    rich_text = _rich_text("Energy $E = mc^2$ is conserved")
+    assert [part["type"] for part in rich_text] == ["text", "equation", "text"]
+    assert rich_text[1]["equation"]["expression"] == "E = mc^2"
+
+    assert len(_rich_text("a" * 4500)) == 3
+
+def test_rate_limited_requests_are_retried(client, fake_notion, temp_dir):
+    """Test that requests answered with HTTP 429 are retried."""
+    fake_notion.RequestHandlerClass.failures.extend([429, None, 429, 429])
+    summary = Summary(topics=[make_topic("Entropy", ["a", "b"])])
+    state = NotionSync(client, temp_dir / "sync.json").sync(summary, "parent")
+
+    assert page_texts(fake_notion, state.page_id) == page_texts_for(summary)
+
+def test_failed_sync_keeps_mapping_of_sent_blocks(client, fake_notion, temp_dir):
+    """Test that a sync failing midway saves a mapping matching the page, and the next sync completes it."""
+    before = Summary(topics=[make_topic(f"Topic {i}", ["a", "b"]) for i in range(6)])
+    after = before.model_copy(deep=True)
+    after.topics[1].key_insights[0] = "changed"
+    after.topics[4].key_insights = ["x", "y", "z"]
+    after.topics.pop(2)
+    sync = NotionSync(client, temp_dir / "sync.json")
+    state = sync.sync(before, "parent")
+
+    # The first update succeeds, the following request fails
+    fake_notion.RequestHandlerClass.failures.extend([None, 500])
+    with pytest.raises(urllib.error.HTTPError):
+        sync.sync(after, "parent")
+    saved = NotionSyncState.load(temp_dir / "sync.json")
+    assert saved.blocks != state.blocks
+    assert saved.block_ids == fake_notion.RequestHandlerClass.pages[state.page_id]["children"]
+
+    state = sync.sync(after, "parent")
+    assert page_texts(fake_notion, state.page_id) == page_texts_for(after)
+    assert state.block_ids == fake_notion.RequestHandlerClass.pages[state.page_id]["children"]
+
+def test_state_of_another_parent_is_not_reused(client, temp_dir):
+    """Test that a state file is not used to sync a page under a different parent."""
+    summary = Summary(topics=[make_topic("Entropy", ["a"])])
+    sync = NotionSync(client, temp_dir / "sync.json")
+    sync.sync(summary, "parent")
+
+    with pytest.raises(ValueError):
+        sync.sync(summary, "other-parent")
+
+def test_decks_sharing_first_topic_get_separate_pages(client, fake_notion, temp_dir):
+    """Test that two decks starting with the same topic keep separate state files and pages."""
+    first = Summary(topics=[make_topic("Introduction", ["a"]), make_topic("Entropy", ["b"])])
+    second = Summary(topics=[make_topic("Introduction", ["a"]), make_topic("Waves", ["c"])])
+    first_path = default_state_path(temp_dir / "thermo.pptx")
+    second_path = default_state_path(temp_dir / "physics.pdf")
+
+    first_state = NotionSync(client, first_path).sync(first, "parent")
+    second_state = NotionSync(client, second_path).sync(second, "parent")
+
+    assert first_path != second_path
+    assert first_state.page_id != second_state.page_id
+    assert page_texts(fake_notion, first_state.page_id) == page_texts_for(first)
+    assert page_texts(fake_notion, second_state.page_id) == page_texts_for(second)
@@ -0,0 +1,58 @@
+import pytest
+from src.pdf_backends import PdfBackendFactory, PdfBackend, PyMuPdfBackend
+from src.presentation_processor import PresentationProcessor
+from benchmarks.pdf_backends import generate_deck, fidelity
+
+
+@pytest.fixture
+def text_pdf(temp_dir):
+    path = temp_dir / "deck.pdf"
+    return path, generate_deck(path, pages=3)
+
+@pytest.mark.parametrize("name", PdfBackendFactory.available())
+def test_backend_extracts_all_text(name, text_pdf):
+    """Test that every installed backend extracts each page's text, whatever its spacing and order."""
+    path, expected = text_pdf
+    pages = PdfBackendFactory.get_backend(name).extract_pages(path)
+
+    assert len(pages) == 3
+    for want, got in zip(expected, pages):
+        assert sorted("".join(want.split())) == sorted("".join(got.split()))
+
+@pytest.mark.skipif(not PyMuPdfBackend.is_available(), reason="pymupdf not installed")
+def test_pymupdf_keeps_reading_order(text_pdf):
+    """Test that text drawn bottom-up is returned top to bottom, one column at a time."""
+    path, expected = text_pdf
+    assert fidelity(expected, PyMuPdfBackend().extract_pages(path)) == 1.0
+
+def test_unknown_backend():
+    """Test requesting a backend that does not exist."""
+    with pytest.raises(ValueError, match="not supported"):
+        PdfBackendFactory.get_backend("acrobat")
+
+def test_select_named_backend():
+    """Test that naming a backend disables automatic selection."""
+    backends = PdfBackendFactory.select("pypdf2")
+    assert [type(backend).__name__ for backend in backends] == ["PyPDF2Backend"]
+
+def test_select_prefers_first_available():
+    """Test that automatic selection follows the preference order."""
+    backends = PdfBackendFactory.select()
+    assert [type(backend) for backend in backends] == \
+        [PdfBackendFactory._backends[name] for name in PdfBackendFactory.available()]
+
+def test_processor_falls_back_to_next_backend(text_pdf, monkeypatch, caplog):
+    """Test that a failing backend is skipped for the next one and only logged as a warning."""
+    class BrokenBackend(PdfBackend):
+        module = "json"
+
+        def extract_pages(self, file_path):
+            raise ValueError("broken file")
+
+    monkeypatch.setattr(PdfBackendFactory, "_backends", {"broken": BrokenBackend, **PdfBackendFactory._backends})
+    path, expected = text_pdf
+    slides = PresentationProcessor().process_file(path)
+
+    assert len(slides) == 3
+    assert slides[0].metadata == {"page_count": 3, "file_type": "pdf"}
+    assert [record.levelname for record in caplog.records] == ["WARNING"]
@@ -70,3 +70,37 @@ def test_pptx_content_extraction(processor, sample_pptx):
     assert "This is the first slide content" in slides[0].text
     assert "Second Slide" in slides[1].text
     assert "This is the second slide content" in slides[1].text
+
+def test_streaming_pptx_matches_object_model(rich_pptx):
+    """Test that the streaming reader agrees with python-pptx apart from level indentation."""
+    streamed = PresentationProcessor()._process_pptx_streaming(rich_pptx)
+    object_model = PresentationProcessor(stream_pptx=False).process_file(rich_pptx)
+
+    assert len(streamed) == len(object_model) == 2
+    # The movie's poster frame is a p:pic element but not an image
+    assert len(streamed[1].images) == 1
+    # Like python-pptx, a filled picture placeholder is not reported as an image
+    assert streamed[0].images == []
+    for fast, slow in zip(streamed, object_model):
+        assert fast.slide_number == slow.slide_number
+        assert fast.text.replace("  Sub point", "Sub point") == slow.text
+        assert fast.images == slow.images
+        assert fast.metadata == slow.metadata
+
+def test_streaming_pptx_slide_order_and_levels(rich_pptx):
+    """Test that slides follow presentation order and keep paragraph levels."""
+    slides = PresentationProcessor().process_file(rich_pptx)
+
+    assert slides[0].text == "Line\vbreak"
+    assert "Top point\n  Sub point" in slides[1].text
+    assert "Grouped text" not in slides[1].text
+    assert slides[1].images[0]["position"]["width"] == 3 * 914400
+
+def test_streaming_pptx_falls_back(processor, sample_pptx, monkeypatch):
+    """Test that python-pptx is used when the streaming reader fails."""
+    def fail(file_path):
+        raise ValueError("broken part")
+    monkeypatch.setattr(processor, "_process_pptx_streaming", fail)
+
+    slides = processor.process_file(sample_pptx)
+    assert "First Slide" in slides[0].text
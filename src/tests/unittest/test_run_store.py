@@ -0,0 +1,97 @@
+import pytest
+from src.run_store import RunStore, load_summary_file
+from src.content_analyzer import AnalyzedContent
+from src.llm_processor import Concept, Concepts, Summary, TopicSummary
+
+
+TARGETS = [
+    {"exporter": "markdown", "export_path": "out.md"},
+    {"exporter": "json", "export_path": "out.json"},
+]
+
+@pytest.fixture
+def run(temp_dir):
+    return RunStore.create(temp_dir, {"source_path": "deck.pptx", "targets": TARGETS})
+
+@pytest.fixture
+def sample_summary():
+    return Summary(topics=[
+        TopicSummary(
+            topic="Entropy",
+            examples=None,
+            key_terms=["$H(X)$"],
+            detailed_explanation="Entropy measures uncertainty.",
+            summary="Uncertainty of a random variable.",
+            key_insights=["Maximal for uniform distributions"]
+        )
+    ])
+
+def test_new_run_starts_at_slides(run):
+    """Test that a fresh run has no checkpoints."""
+    assert run.first_incomplete_stage() == "slides"
+    assert run.options["source_path"] == "deck.pptx"
+
+def test_open_missing_run(temp_dir):
+    """Test opening a run that does not exist."""
+    with pytest.raises(FileNotFoundError):
+        RunStore.open(temp_dir, "missing")
+
+def test_checkpoints_round_trip(run, temp_dir, sample_slides, sample_summary):
+    """Test that every stage is restored exactly from a reopened run."""
+    analyzed = [AnalyzedContent(slide_number=1, main_text="Entropy", topic="Entropy", metadata={"type": "title"})]
+    concepts = Concepts(concepts=[Concept(topic="Entropy", key_ideas=["uncertainty"])])
+
+    run.save_slides(sample_slides)
+    run.save_analyzed(analyzed)
+    run.save_concepts(concepts)
+    run.save_summary(sample_summary)
+
+    reopened = RunStore.open(temp_dir, run.run_id)
+    assert reopened.load_slides() == sample_slides
+    assert reopened.load_analyzed() == analyzed
+    assert reopened.load_concepts() == concepts
+    assert reopened.load_summary() == sample_summary
+
+def test_resume_stage_progression(run, sample_slides, sample_summary):
+    """Test that the first incomplete stage advances as checkpoints are saved."""
+    run.save_slides(sample_slides)
+    assert run.first_incomplete_stage() == "analyzed"
+
+    run.save_analyzed([])
+    run.save_concepts(Concepts(concepts=[]))
+    run.save_summary(sample_summary)
+    assert run.first_incomplete_stage() == "export"
+
+    run.mark_exported(TARGETS[0])
+    assert run.first_incomplete_stage() == "export"
+    assert run.pending_targets() == [TARGETS[1]]
+
+    run.mark_exported(TARGETS[1])
+    assert run.first_incomplete_stage() is None
+
+def test_run_from_summary_resumes_at_export(run, sample_summary):
+    """Test that a run holding only a summary checkpoint resumes at export."""
+    run.save_summary(sample_summary)
+    assert run.first_incomplete_stage() == "export"
+
+    for target in TARGETS:
+        run.mark_exported(target)
+    assert run.first_incomplete_stage() is None
+
+def test_load_missing_stage(run):
+    """Test loading a stage that was never saved."""
+    with pytest.raises(ValueError, match="no 'concepts' checkpoint"):
+        run.load_concepts()
+
+def test_update_options_ignores_none(run):
+    """Test that only provided options override the stored ones."""
+    run.update_options(source_path="other.pptx", targets=None)
+
+    assert run.options["source_path"] == "other.pptx"
+    assert run.options["targets"] == TARGETS
+
+def test_load_summary_file(run, sample_summary):
+    """Test loading a summary.json checkpoint directly."""
+    run.save_summary(sample_summary)
+
+    assert load_summary_file(run.run_dir / "summary.json") == sample_summary
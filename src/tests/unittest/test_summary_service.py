@@ -0,0 +1,146 @@
+import pytest
+import json
+import threading
+import urllib.request
+import urllib.error
+from src.summary_service import SummaryService, JobStatus, QueueFullError, create_server
+from src.llm_processor import Concept, Concepts, Summary, TopicSummary
+
+
+class FakeLLMProcessor:
+    def extract_concepts(self, analyzed_slides):
+        return Concepts(concepts=[Concept(topic=slide.topic or "", key_ideas=[]) for slide in analyzed_slides])
+
+    def summarize(self, concepts):
+        return Summary(topics=[
+            TopicSummary(topic=c.topic, examples=None, key_terms=None, detailed_explanation=None,
+                         summary=c.topic, key_insights=[])
+            for c in concepts.concepts
+        ])
+
+class FakeExporter:
+    def __init__(self):
+        self.exported = []
+        self.closed_loops = 0
+
+    async def export(self, summary):
+        self.exported.append(summary)
+
+    async def aclose(self):
+        self.closed_loops += 1
+
+
+@pytest.fixture
+def exporters():
+    return {}
+
+@pytest.fixture
+def service(processor, content_analyzer, exporters):
+    def exporter_factory(exporter, export_path):
+        exporters[(exporter, export_path)] = FakeExporter()
+        return exporters[(exporter, export_path)]
+
+    return SummaryService(processor, content_analyzer, FakeLLMProcessor(), exporter_factory, workers=2, max_queue=4)
+
+def test_jobs_run_to_completion(service, exporters, sample_pptx):
+    """Test that queued jobs are processed and exported."""
+    service.start()
+    jobs = [service.submit(str(sample_pptx), "markdown", "out.md") for _ in range(3)]
+    service.stop()
+
+    assert all(job.status == JobStatus.SUCCEEDED for job in jobs)
+    assert set(jobs[0].stage_seconds) == {"parse", "analyze", "concepts", "summary", "export"}
+    # The exporter is created once and reused by every job
+    assert len(exporters) == 1
+    assert len(exporters[("markdown", "out.md")].exported) == 3
+    # Each worker closes what the exporter holds on its event loop when the service stops
+    assert exporters[("markdown", "out.md")].closed_loops == 2
+
+def test_failed_job_reports_error(service, temp_dir):
+    """Test that a failing job is marked as failed with its error."""
+    service.start()
+    job = service.submit(str(temp_dir / "missing.pptx"), "markdown")
+    service.stop()
+
+    assert job.status == JobStatus.FAILED
+    assert "File not found" in job.error
+    assert service.metrics()["jobs"]["failed"] == 1
+
+def test_queue_is_bounded(service, sample_pptx):
+    """Test that submissions beyond the queue capacity are rejected."""
+    for _ in range(4):
+        service.submit(str(sample_pptx), "markdown")
+
+    with pytest.raises(QueueFullError):
+        service.submit(str(sample_pptx), "markdown")
+    assert len(service.list_jobs()) == 4
+
+def test_unknown_exporter_is_rejected(service, sample_pptx):
+    """Test that a job for an unsupported exporter is rejected at submission."""
+    with pytest.raises(ValueError, match="not supported"):
+        service.submit(str(sample_pptx), "pdf")
+    assert service.list_jobs() == []
+
+def test_finished_jobs_are_evicted(processor, content_analyzer, sample_pptx):
+    """Test that only the most recent finished jobs are kept while the counts keep growing."""
+    service = SummaryService(processor, content_analyzer, FakeLLMProcessor(), lambda exporter, path: FakeExporter(),
+                             workers=1, max_queue=8, max_history=2)
+    service.start()
+    jobs = [service.submit(str(sample_pptx), "markdown") for _ in range(5)]
+    service.stop()
+
+    assert [job.job_id for job in service.list_jobs()] == [job.job_id for job in jobs[-2:]]
+    assert service.get_job(jobs[0].job_id) is None
+    assert service.metrics()["jobs"]["succeeded"] == 5
+
+def test_metrics(service, sample_pptx):
+    """Test the throughput metrics after a few jobs."""
+    service.start()
+    for _ in range(2):
+        service.submit(str(sample_pptx), "markdown")
+    service.stop()
+
+    metrics = service.metrics()
+    assert metrics["jobs"]["succeeded"] == 2
+    assert metrics["queue_depth"] == 0
+    assert metrics["jobs_per_minute"] > 0
+    assert "parse" in metrics["avg_stage_seconds"]
+
+def test_http_api(service, sample_pptx):
+    """Test submitting a job and reading its status over HTTP."""
+    server = create_server(service, port=0)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        request = urllib.request.Request(
+            f"{base_url}/jobs",
+            data=json.dumps({"source_path": str(sample_pptx)}).encode(),
+            method="POST"
+        )
+        with urllib.request.urlopen(request) as response:
+            assert response.status == 202
+            job_id = json.load(response)["job_id"]
+
+        service.start()
+        service.stop()
+
+        with urllib.request.urlopen(f"{base_url}/jobs/{job_id}") as response:
+            assert json.load(response)["status"] == "succeeded"
+        with urllib.request.urlopen(f"{base_url}/metrics") as response:
+            assert json.load(response)["jobs"]["succeeded"] == 1
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{base_url}/jobs/unknown")
+        assert error.value.code == 404
+
+        request = urllib.request.Request(
+            f"{base_url}/jobs",
+            data=json.dumps({"source_path": str(sample_pptx), "exporter": "pdf"}).encode(),
+            method="POST"
+        )
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request)
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
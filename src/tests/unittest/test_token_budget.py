@@ -0,0 +1,86 @@
+import pytest
+from src.content_analyzer import AnalyzedContent
+from src.llm_processor import Concept, Concepts
+from src.token_budget import TokenBudgeter, BudgetReport, TopicBudget
+
+
+@pytest.fixture
+def deck():
+    slides = [
+        AnalyzedContent(slide_number=1, main_text="Course logistics\n• Office hours Tuesday\n• Homework due Friday",
+                        topic="Course logistics", metadata={}),
+        AnalyzedContent(slide_number=2, main_text=(
+            "Bayes theorem derivation\n"
+            "$P(A|B) = \\frac{P(B|A) P(A)}{P(B)}$ follows from $P(A \\cap B) = P(B|A) P(A) = P(A|B) P(B)$.\n"
+            + "The posterior combines prior and likelihood, normalized by the evidence $P(B) = \\sum_i P(B|A_i) P(A_i)$. " * 8
+        ), topic="Bayes theorem derivation", metadata={}),
+    ]
+    concepts = Concepts(concepts=[
+        Concept(topic="Course logistics", key_ideas=["Office hours on Tuesday", "Homework due Friday"]),
+        Concept(topic="Bayes theorem", key_ideas=["Derivation from conditional probability", "Posterior",
+                                                   "Likelihood", "Evidence as normalizer"]),
+    ])
+    return concepts, slides
+
+def test_dense_topic_gets_larger_budget(deck):
+    """Test that the derivation gets more output tokens than the logistics slide."""
+    concepts, slides = deck
+    report = TokenBudgeter(deck_budget=6000).plan(concepts, slides)
+
+    light, dense = report.topics
+    assert light.source_slides == [1]
+    assert dense.source_slides == [2]
+    assert dense.max_tokens > 2 * light.max_tokens
+    assert report.planned_tokens <= 6000
+
+def test_budget_respects_bounds(deck):
+    """Test the per-topic minimum and maximum."""
+    concepts, slides = deck
+    tiny = TokenBudgeter(deck_budget=100, min_tokens=300).plan(concepts, slides)
+    assert [topic.max_tokens for topic in tiny.topics] == [300, 300]
+    # The minimums take precedence over the deck budget, and the report says so
+    assert tiny.overrun_tokens == 500
+    assert "500 tokens over the deck budget" in tiny.format()
+
+    capped = TokenBudgeter(deck_budget=10000, min_tokens=300, max_tokens=4000).plan(concepts, slides)
+    assert max(topic.max_tokens for topic in capped.topics) == 4000
+    assert capped.planned_tokens <= 10000
+    assert capped.overrun_tokens == 0
+    assert "over the deck budget" not in capped.format()
+
+def test_unmatched_concept_uses_key_ideas(deck):
+    """Test that a concept without source slides is weighted by its key ideas."""
+    _, slides = deck
+    concepts = Concepts(concepts=[Concept(topic="Zebra", key_ideas=["stripes"])])
+    report = TokenBudgeter(deck_budget=1000).plan(concepts, slides)
+
+    assert report.topics[0].source_slides == []
+    assert report.topics[0].max_tokens == 1000
+
+def test_invalid_bounds():
+    """Test that a minimum above the maximum is rejected."""
+    with pytest.raises(ValueError):
+        TokenBudgeter(min_tokens=500, max_tokens=400)
+
+def test_guidance_scales_with_budget():
+    """Test that small budgets ask for brevity and large ones for depth."""
+    light = TopicBudget(topic="Logistics", weight=1, max_tokens=300, source_slides=[])
+    dense = TopicBudget(topic="Bayes", weight=5, max_tokens=3000, source_slides=[])
+
+    assert "light topic" in light.guidance()
+    assert "dense topic" in dense.guidance()
+    assert "about 1125 words" in dense.guidance()
+
+def test_report_totals():
+    """Test planned and used totals in the report."""
+    report = BudgetReport(deck_budget=1000, topics=[
+        TopicBudget(topic="A", weight=1, max_tokens=400, source_slides=[], used_tokens=350),
+        TopicBudget(topic="B", weight=1, max_tokens=600, source_slides=[], used_tokens=None),
+    ])
+    assert report.planned_tokens == 1000
+    assert report.used_tokens is None
+
+    report.topics[1].used_tokens = 500
+    assert report.used_tokens == 850
+    assert report.to_dict()["used_tokens"] == 850
+    assert "850" in report.format()
@@ -0,0 +1,175 @@
+from typing import Dict, List, Optional, Set
+from dataclasses import dataclass, field, asdict
+from src.content_analyzer import AnalyzedContent
+from src.llm_processor import Concept, Concepts
+import logging
+import math
+import re
+
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+# Characters and LaTeX commands that mark mathematical content
+MATH_PATTERN = re.compile(r'\$|\\[a-zA-Z]+|[=^_∑∫√≤≥±×÷∂∇→]')
+STOP_WORDS = {"the", "a", "an", "of", "and", "or", "to", "in", "on", "for", "is", "are", "with", "by", "as", "at", "its"}
+
+# Rough conversion between output tokens and English words
+WORDS_PER_TOKEN = 0.75
+
+@dataclass
+class TopicBudget:
+    """Output token allowance for one topic and the evidence it was derived from."""
+    topic: str
+    weight: float
+    max_tokens: int
+    source_slides: List[int]
+    used_tokens: Optional[int] = None
+
+    @property
+    def explanation_words(self) -> int:
+        # About half of the output goes to detailed_explanation, the rest to the other fields and JSON
+        return max(40, int(self.max_tokens * WORDS_PER_TOKEN / 2))
+
+    def guidance(self) -> str:
+        """Length guidance for the prompt, scaled to the topic's budget."""
+        if self.explanation_words < 150:
+            depth = "This is a light topic: be brief and skip worked examples unless essential."
+        elif self.explanation_words < 400:
+            depth = "Cover the idea clearly with at most one short example."
+        else:
+            depth = "This is a dense topic: go in depth, with worked examples and derivations where they help."
+        return f"Keep detailed_explanation to about {self.explanation_words} words. {depth}"
+
+@dataclass
+class BudgetReport:
+    """Planned output tokens per topic compared with what the model actually used."""
+    deck_budget: int
+    topics: List[TopicBudget] = field(default_factory=list)
+
+    @property
+    def planned_tokens(self) -> int:
+        return sum(topic.max_tokens for topic in self.topics)
+
+    @property
+    def overrun_tokens(self) -> int:
+        """Tokens planned beyond the deck budget, which happens when the per-topic minimums do not fit in it."""
+        return max(self.planned_tokens - self.deck_budget, 0)
+
+    @property
+    def used_tokens(self) -> Optional[int]:
+        used = [topic.used_tokens for topic in self.topics]
+        return None if any(tokens is None for tokens in used) else sum(used)
+
+    def to_dict(self) -> Dict:
+        return {
+            "deck_budget": self.deck_budget,
+            "planned_tokens": self.planned_tokens,
+            "overrun_tokens": self.overrun_tokens,
+            "used_tokens": self.used_tokens,
+            "topics": [asdict(topic) for topic in self.topics],
+        }
+
+    def format(self) -> str:
+        lines = [f"{'topic':<40} {'weight':>7} {'budget':>7} {'used':>7}"]
+        for topic in self.topics:
+            used = "-" if topic.used_tokens is None else str(topic.used_tokens)
+            lines.append(f"{topic.topic[:40]:<40} {topic.weight:>7.2f} {topic.max_tokens:>7} {used:>7}")
+        used_total = "-" if self.used_tokens is None else str(self.used_tokens)
+        lines.append(f"{'total (deck budget ' + str(self.deck_budget) + ')':<40} {'':>7} {self.planned_tokens:>7} {used_total:>7}")
+        if self.overrun_tokens:
+            lines.append(f"planned {self.overrun_tokens} tokens over the deck budget to give every topic its minimum")
+        return '\n'.join(lines)
+
+class TokenBudgeter:
+    """
+    Splits a per-deck output token budget between topics according to how much material each one covers.
+
+    A concept's weight comes from the slides it was extracted from: their text volume, the number of key
+    ideas and how much of the text is mathematical. Light topics such as course logistics get short answers
+    while dense derivations keep their depth.
+    """
+
+    def __init__(self, deck_budget: int = 16000, min_tokens: int = 600, max_tokens: int = 4000):
+        """
+        Args:
+            deck_budget: Output tokens available for all topic summaries of a deck
+            min_tokens: Smallest allowance for a topic, enough for a short answer in every field. Takes precedence
+                over the deck budget when the deck has too many topics for it
+            max_tokens: Largest allowance for a single topic
+        """
+        if min_tokens > max_tokens:
+            raise ValueError("min_tokens must not exceed max_tokens")
+        self.deck_budget = deck_budget
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self.logger = logging.getLogger(__name__)
+
+    def plan(self, concepts: Concepts, analyzed_slides: List[AnalyzedContent]) -> BudgetReport:
+        """
+        Assigns each concept its output token allowance.
+
+        Returns:
+            BudgetReport with one TopicBudget per concept, in concept order
+        """
+        slide_words = {slide.slide_number: _words(slide.main_text) for slide in analyzed_slides}
+        slide_text = {slide.slide_number: slide.main_text for slide in analyzed_slides}
+
+        topics = []
+        for concept in concepts.concepts:
+            sources = self._source_slides(concept, slide_words)
+            text = ' '.join(slide_text[number] for number in sources) or ' '.join(concept.key_ideas)
+            topics.append(TopicBudget(
+                topic=concept.topic,
+                weight=self._weight(concept, text),
+                max_tokens=0,
+                source_slides=sources,
+            ))
+
+        self._allocate(topics)
+        report = BudgetReport(deck_budget=self.deck_budget, topics=topics)
+        if report.overrun_tokens:
+            self.logger.warning(
+                f"{len(topics)} topics need at least {self.min_tokens} tokens each, planning "
+                f"{report.overrun_tokens} tokens over the deck budget of {self.deck_budget}"
+            )
+        return report
+
+    @staticmethod
+    def _source_slides(concept: Concept, slide_words: Dict[int, Set[str]]) -> List[int]:
+        """Finds the slides a concept most likely came from by word overlap with its topic and key ideas."""
+        concept_words = _words(' '.join([concept.topic] + concept.key_ideas))
+        if not concept_words:
+            return []
+        scores = {number: len(concept_words & words) / len(concept_words) for number, words in slide_words.items()}
+        best = max(scores.values(), default=0)
+        if best == 0:
+            return []
+        return [number for number, score in scores.items() if score >= best / 2]
+
+    @staticmethod
+    def _weight(concept: Concept, text: str) -> float:
+        volume = math.sqrt(len(text.split())) / 2
+        ideas = len(concept.key_ideas)
+        math_density = len(MATH_PATTERN.findall(text)) / max(len(text.split()), 1)
+        return 1.0 + volume + 0.5 * ideas + 4 * min(math_density, 1.0)
+
+    def _allocate(self, topics: List[TopicBudget]) -> None:
+        """
+        Splits the deck budget proportionally to weight, within the per-topic bounds.
+        Topics raised to the minimum take their tokens from the others. Tokens cut by the maximum are
+        not handed to lighter topics: the deck budget is a ceiling, not a target.
+        """
+        remaining = list(topics)
+        budget = self.deck_budget
+        while remaining:
+            total_weight = sum(topic.weight for topic in remaining)
+            below_min = [topic for topic in remaining if budget * topic.weight / total_weight < self.min_tokens]
+            if not below_min:
+                for topic in remaining:
+                    topic.max_tokens = min(int(budget * topic.weight / total_weight), self.max_tokens)
+                break
+            for topic in below_min:
+                topic.max_tokens = self.min_tokens
+                budget -= self.min_tokens
+                remaining.remove(topic)
+
+def _words(text: str) -> Set[str]:
+    return {word for word in WORD_PATTERN.findall(text.lower()) if word not in STOP_WORDS and len(word) > 1}